@@ -7,40 +7,46 @@ Measurement Tool
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
 import math
+import colorsys
 import csv
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 import numpy as np
 from PIL import Image, ImageTk
 import matplotlib
 matplotlib.use("TkAgg")
 import matplotlib.font_manager as fm
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-from matplotlib.figure import Figure
-from scipy.stats import norm
-from scipy.ndimage import label as ndimage_label
+# scipy 与 matplotlib 的 Tk 绘图后端只在分析/直方图/导出时用到，在对应函数内按需导入以缩短启动时间
+
+try:
+    import cv2  # 可选依赖：安装了 OpenCV 时 RGB → HSV 走其 SIMD 实现
+except ImportError:
+    cv2 = None
 
 
 # ---------------------------------------------------------------------------
 # matplotlib 中文字体配置
 # ---------------------------------------------------------------------------
 
+_CJK_FONT_CANDIDATES = (
+    "Microsoft YaHei", "SimHei", "SimSun", "NSimSun",
+    "FangSong", "KaiTi", "Source Han Sans CN",
+    "WenQuanYi Micro Hei", "Noto Sans CJK SC", "Arial Unicode MS",
+)
+
+
 def _setup_matplotlib_font():
     """自动检测系统中可用的 CJK 字体并配置 matplotlib。"""
-    candidates = [
-        "Microsoft YaHei", "SimHei", "SimSun", "NSimSun",
-        "FangSong", "KaiTi", "Source Han Sans CN",
-        "WenQuanYi Micro Hei", "Noto Sans CJK SC", "Arial Unicode MS",
-    ]
-    available = {f.name for f in fm.fontManager.ttflist}
-    for name in candidates:
-        if name in available:
-            matplotlib.rcParams["font.sans-serif"] = [name, "DejaVu Sans"]
-            matplotlib.rcParams["axes.unicode_minus"] = False
-            return name
-    # 回退: 仍然关闭 unicode_minus 以免减号显示异常
+    # 只扫描一遍已加载的字体列表 (不用 findfont 逐个探测：每次都要给全部字体打分)
+    available = frozenset(f.name for f in fm.fontManager.ttflist)
+    name = next((c for c in _CJK_FONT_CANDIDATES if c in available), None)
+    if name is not None:
+        matplotlib.rcParams["font.sans-serif"] = [name, "DejaVu Sans"]
+    # 未找到时仍然关闭 unicode_minus 以免减号显示异常
     matplotlib.rcParams["axes.unicode_minus"] = False
-    return None
+    return name
 
 _CJK_FONT = _setup_matplotlib_font()
 
@@ -190,6 +196,12 @@ STRINGS = {
     "ca_v_tol":             {"zh": "V 容差:",        "en": "V Tol:"},
     "ca_min_area":          {"zh": "最小面积:",      "en": "Min Area:"},
     "ca_min_area_unit":     {"zh": "px",             "en": "px"},
+    "ca_fast_preview":      {"zh": "快速预览",       "en": "Fast Preview"},
+    "ca_fast_preview_desc": {"zh": "拖动滑块时在缩略图上计算，面积为近似值；统计/导出前自动精确计算",
+                             "en": "Computed on the thumbnail while dragging (approx. areas); "
+                                   "refined automatically before histogram/export"},
+    "ca_refine":            {"zh": "精确计算",       "en": "Refine"},
+    "ca_approx":            {"zh": "近似值 (快速预览)", "en": "approx. (fast preview)"},
     "ca_preview":           {"zh": "预览",           "en": "Preview"},
     "ca_stats":             {"zh": "统计",           "en": "Statistics"},
     "ca_particle_count":    {"zh": "颗粒数: {n}",   "en": "Particles: {n}"},
@@ -365,6 +377,11 @@ STRINGS = {
                                 "Contact: wangpeijiang0802@gmail.com"},
 }
 
+# 按语言展开的扁平查找表 {key: text}，英文缺失时回退到中文
+_ZH = {key: entry.get("zh", key) for key, entry in STRINGS.items()}
+_EN = {key: entry.get("en", _ZH[key]) for key, entry in STRINGS.items()}
+_LANG_TABLES = {"zh": _ZH, "en": _EN}
+
 
 # ---------------------------------------------------------------------------
 # 标尺校准对话框
@@ -470,6 +487,20 @@ class Measurement:
         self.pixel_dist = math.hypot(x2 - x1, y2 - y1)
         self.nm_dist = self.pixel_dist * scale if scale else 0.0
 
+    @classmethod
+    def from_arrays(cls, x1, y1, x2, y2, scale):
+        """由四个等长坐标数组批量创建测量，距离用一次 np.hypot 整体计算。"""
+        x1, y1, x2, y2 = (np.asarray(a, dtype=np.float64) for a in (x1, y1, x2, y2))
+        pixel = np.hypot(x2 - x1, y2 - y1)
+        nm = pixel * scale if scale else np.zeros_like(pixel)
+        out = []
+        for row in zip(x1.tolist(), y1.tolist(), x2.tolist(), y2.tolist(),
+                       pixel.tolist(), nm.tolist()):
+            m = cls.__new__(cls)
+            m.x1, m.y1, m.x2, m.y2, m.pixel_dist, m.nm_dist = row
+            out.append(m)
+        return out
+
     @property
     def mid_x(self):
         return (self.x1 + self.x2) / 2.0
@@ -492,45 +523,154 @@ class MeasurementGroup:
 
     def contains_measurement(self, m: Measurement) -> bool:
         """判断测量的中点是否在此分组矩形内（含边界）。"""
-        mx, my = m.mid_x, m.mid_y
-        return self.x1 <= mx <= self.x2 and self.y1 <= my <= self.y2
+        # 直接由端点求中点，省去两次 property 调用
+        mx = (m.x1 + m.x2) / 2.0
+        if not self.x1 <= mx <= self.x2:
+            return False
+        my = (m.y1 + m.y2) / 2.0
+        return self.y1 <= my <= self.y2
 
 
-def assign_groups(measurements, groups):
-    """为每个测量分配分组标签，返回与 measurements 等长的列表。"""
-    labels = []
-    for m in measurements:
-        assigned = ""
-        for g in groups:
-            if g.contains_measurement(m):
-                assigned = g.name
-                break
-        labels.append(assigned)
-    return labels
+def assign_groups(measurements, groups, coords=None):
+    """为每个测量分配分组标签，返回与 measurements 等长的列表。
+
+    中点与各分组矩形一次性广播比较得到 (N, G) 布尔矩阵，命中多个分组时取第一个。
+    coords 为已有的 (N, 4) 端点数组 (如主窗口的 _meas_xy) 时直接使用，不再逐个读取属性。
+    """
+    n = len(measurements)
+    if not groups:
+        return [""] * n
+    if coords is not None:
+        mx = ((coords[:, 0] + coords[:, 2]) / 2.0)[:, None]
+        my = ((coords[:, 1] + coords[:, 3]) / 2.0)[:, None]
+    else:
+        mx = np.fromiter((m.mid_x for m in measurements), np.float64, count=n)[:, None]
+        my = np.fromiter((m.mid_y for m in measurements), np.float64, count=n)[:, None]
+    bounds = np.array([(g.x1, g.y1, g.x2, g.y2) for g in groups], dtype=np.float64)
+    gx1, gy1, gx2, gy2 = bounds.T
+    inside = (mx >= gx1) & (mx <= gx2) & (my >= gy1) & (my <= gy2)
+    # 末尾追加 "" 作为未命中任何分组时的标签
+    names = [g.name for g in groups] + [""]
+    idx = np.where(inside.any(axis=1), inside.argmax(axis=1), len(groups))
+    return [names[i] for i in idx.tolist()]
+
+
+def count_in_rect(coords, x1, y1, x2, y2):
+    """统计中点落在矩形内 (含边界) 的测量数，判定规则与 MeasurementGroup.contains_measurement 相同。
+
+    coords 为 _measurement_arrays 得到的 (N, 4) 端点数组，整体比较，不逐个调用方法。
+    """
+    lo_x, hi_x = min(x1, x2), max(x1, x2)
+    lo_y, hi_y = min(y1, y2), max(y1, y2)
+    mx = (coords[:, 0] + coords[:, 2]) / 2.0
+    my = (coords[:, 1] + coords[:, 3]) / 2.0
+    return int(np.count_nonzero((mx >= lo_x) & (mx <= hi_x) & (my >= lo_y) & (my <= hi_y)))
+
+
+_SQRT_2PI = math.sqrt(2.0 * math.pi)
+
+_HIST_MAX_BINS = 64  # 直方图箱数上限，数据量很大时 √N 规则给出的箱数过多
+
+
+def _hist_bins(n):
+    """直方图箱数：√N 取整，至少 5 个，至多 _HIST_MAX_BINS 个。"""
+    return min(_HIST_MAX_BINS, max(5, int(math.sqrt(n))))
+
+
+# CSV 高斯拟合曲线的采样点数，以及跨次导出复用的 x / y 缓冲
+_FIT_N = 200
+_FIT_I = np.arange(_FIT_N, dtype=np.float64)
+_FIT_X = np.empty(_FIT_N, dtype=np.float64)
+_FIT_Y = np.empty(_FIT_N, dtype=np.float64)
+
+
+def _gaussian_pdf(x, mu, sigma, out=None):
+    """正态分布概率密度 (与 scipy.stats.norm.pdf 相同，直接按闭式公式计算)。
+
+    给出 out 时结果原地写入 out，不分配新数组。
+    """
+    z = np.subtract(x, mu, out=out)
+    z /= sigma
+    np.multiply(z, z, out=z)
+    z *= -0.5
+    np.exp(z, out=z)
+    z /= sigma * _SQRT_2PI
+    return z
+
+
+def _describe(vals):
+    """返回一维数组的 (n, mean, std, min, max)，std 为样本标准差 (ddof=1，n < 2 时为 0)。
+
+    均值只求一次，方差由去均值后的点积一次得到，
+    不像 mean() 再 std() 那样重复求均值并另外分配平方数组。调用方保证 vals 非空。
+    """
+    n = len(vals)
+    mean = vals.mean()
+    if n > 1:
+        d = vals - mean
+        std = math.sqrt(d.dot(d) / (n - 1))
+    else:
+        std = 0.0
+    return n, mean, std, vals.min(), vals.max()
+
+
+def _fit_linspace(lo, hi):
+    """与 np.linspace(lo, hi, _FIT_N) 结果相同，但写入复用的 _FIT_X 缓冲。"""
+    np.multiply(_FIT_I, (hi - lo) / (_FIT_N - 1), out=_FIT_X)
+    np.add(_FIT_X, lo, out=_FIT_X)
+    _FIT_X[-1] = hi
+    return _FIT_X
+
+
+def _fit_curve_rows(x_fit, y_fit):
+    """拟合曲线的 CSV 数据行：x / y 两列各整体格式化一次后 zip 成行，供 writerows 写出。"""
+    return zip([f"{xv:.4f}" for xv in x_fit.tolist()],
+               [f"{yv:.6f}" for yv in y_fit.tolist()])
+
+
+def _measurement_arrays(measurements):
+    """将测量列表一次性展开为连续的 float64 数组 (SoA)。
+
+    返回 (coords, pixel_dist, nm_dist)，coords 形状为 (N, 4)，列依次为 X1, Y1, X2, Y2。
+    """
+    n = len(measurements)
+    coords = np.fromiter((v for m in measurements for v in (m.x1, m.y1, m.x2, m.y2)),
+                         np.float64, count=4 * n).reshape(n, 4)
+    pixel_dist = np.fromiter((m.pixel_dist for m in measurements), np.float64, count=n)
+    nm_dist = np.fromiter((m.nm_dist for m in measurements), np.float64, count=n)
+    return coords, pixel_dist, nm_dist
 
 
 def write_csv_with_groups(writer, measurements, groups, group_labels,
                           scale=1.0, lang="zh",
-                          calib_unit="nm", display_unit=None):
-    """将测量数据（含分组）写入 CSV writer。"""
+                          calib_unit="nm", display_unit=None, arrays=None):
+    """将测量数据（含分组）写入 CSV writer。
+
+    arrays 为已有的 (coords, pixel_dist, nm_dist) SoA 数组时直接使用，省去从对象列表重新展开。
+    """
     if display_unit is None:
         display_unit = calib_unit
 
+    table = _LANG_TABLES.get(lang, _ZH)
+
     def _t(key, **kwargs):
-        entry = STRINGS.get(key)
-        if entry is None:
-            return key
-        raw = entry.get(lang, entry.get("zh", key))
+        raw = table.get(key, key)
         if kwargs:
-            return raw.format(**kwargs)
+            return raw.format_map(kwargs)
         return raw
 
-    def _conv(calib_val):
-        return convert_length(calib_val, calib_unit, display_unit)
-
     unit = display_unit if scale > 0 else "px"
     has_groups = len(groups) > 0
 
+    # 一次性转为数组，后续单位换算与统计都在连续缓冲上整体计算
+    if arrays is None:
+        arrays = _measurement_arrays(measurements)
+    coords, pixel_dist, nm_dist = arrays
+    if scale > 0:
+        vals = nm_dist * convert_length(1.0, calib_unit, display_unit)
+    else:
+        vals = pixel_dist
+
     # Header
     header = ["#", _t("csv_diameter", u=unit), _t("csv_pixel_dist"),
               "X1", "Y1", "X2", "Y2"]
@@ -538,32 +678,25 @@ def write_csv_with_groups(writer, measurements, groups, group_labels,
         header.append(_t("csv_group"))
     writer.writerow(header)
 
-    # Data rows
-    for i, m in enumerate(measurements):
-        d = _conv(m.nm_dist) if scale > 0 else m.pixel_dist
-        row = [i + 1, f"{d:.4f}", f"{m.pixel_dist:.4f}",
-               f"{m.x1:.2f}", f"{m.y1:.2f}",
-               f"{m.x2:.2f}", f"{m.y2:.2f}"]
-        if has_groups:
-            row.append(group_labels[i])
-        writer.writerow(row)
+    # Data rows (按列整体格式化后 zip 成行，writerows 一次写完)
+    cols = [range(1, len(vals) + 1),
+            [f"{d:.4f}" for d in vals.tolist()],
+            [f"{pd:.4f}" for pd in pixel_dist.tolist()]]
+    cols += [[f"{c:.2f}" for c in col] for col in coords.T.tolist()]
+    if has_groups:
+        cols.append(group_labels)
+    writer.writerows(zip(*cols))
 
     # Overall statistics
-    if scale > 0:
-        vals = [_conv(m.nm_dist) for m in measurements]
-    else:
-        vals = [m.pixel_dist for m in measurements]
-    n = len(vals)
-    if n > 0:
+    if len(vals) > 0:
         writer.writerow([])
         writer.writerow([_t("csv_stat"), _t("csv_value")])
-        mean = np.mean(vals)
-        std_val = np.std(vals, ddof=1) if n > 1 else 0.0
+        n, mean, std_val, v_min, v_max = _describe(vals)
         writer.writerow([_t("csv_count"), n])
         writer.writerow([_t("csv_mean"), f"{mean:.4f}"])
         writer.writerow([_t("csv_std"), f"{std_val:.4f}"])
-        writer.writerow([_t("csv_min"), f"{min(vals):.4f}"])
-        writer.writerow([_t("csv_max"), f"{max(vals):.4f}"])
+        writer.writerow([_t("csv_min"), f"{v_min:.4f}"])
+        writer.writerow([_t("csv_max"), f"{v_max:.4f}"])
         if scale > 0:
             writer.writerow([_t("csv_scale"), f"{scale:.6f}"])
 
@@ -577,75 +710,295 @@ def write_csv_with_groups(writer, measurements, groups, group_labels,
             writer.writerow([_t("csv_gauss_sigma"), f"{std_val:.4f}"])
 
             writer.writerow([])
-            vals_arr = np.array(vals)
-            x_fit = np.linspace(vals_arr.min() - std_val,
-                                vals_arr.max() + std_val, 200)
-            y_fit = norm.pdf(x_fit, mean, std_val)
+            x_fit = _fit_linspace(v_min - std_val, v_max + std_val)
+            y_fit = _gaussian_pdf(x_fit, mean, std_val, out=_FIT_Y)
             writer.writerow([_t("csv_gauss_curve")])
             writer.writerow([_t("csv_gauss_x", u=unit), _t("csv_gauss_y")])
-            for xv, yv in zip(x_fit, y_fit):
-                writer.writerow([f"{xv:.4f}", f"{yv:.6f}"])
+            writer.writerows(_fit_curve_rows(x_fit, y_fit))
 
     # Per-group statistics
     if has_groups:
+        # 标签一次性映射为整数分组号，各分组只做整数比较 (同名分组共用同一编号)
+        name_idx = {}
         for g in groups:
-            if scale > 0:
-                g_vals = [_conv(m.nm_dist) for m, lbl
-                          in zip(measurements, group_labels) if lbl == g.name]
-            else:
-                g_vals = [m.pixel_dist for m, lbl
-                          in zip(measurements, group_labels) if lbl == g.name]
-            gn = len(g_vals)
-            if gn == 0:
+            name_idx.setdefault(g.name, len(name_idx))
+        gid = np.fromiter((name_idx.get(lbl, -1) for lbl in group_labels),
+                          np.intp, count=len(group_labels))
+        for g in groups:
+            g_vals = vals[gid == name_idx[g.name]]
+            if len(g_vals) == 0:
                 continue
             writer.writerow([])
             writer.writerow([_t("csv_group_stat", name=g.name)])
             writer.writerow([_t("csv_stat"), _t("csv_value")])
-            g_mean = np.mean(g_vals)
-            g_std = np.std(g_vals, ddof=1) if gn > 1 else 0.0
+            gn, g_mean, g_std, g_min, g_max = _describe(g_vals)
             writer.writerow([_t("csv_count"), gn])
             writer.writerow([_t("csv_mean"), f"{g_mean:.4f}"])
             writer.writerow([_t("csv_std"), f"{g_std:.4f}"])
-            writer.writerow([_t("csv_min"), f"{min(g_vals):.4f}"])
-            writer.writerow([_t("csv_max"), f"{max(g_vals):.4f}"])
+            writer.writerow([_t("csv_min"), f"{g_min:.4f}"])
+            writer.writerow([_t("csv_max"), f"{g_max:.4f}"])
 
 
 # ---------------------------------------------------------------------------
-# RGB → HSV 转换 (纯 numpy，不依赖 cv2)
+# RGB → HSV 转换 (有 cv2 时用 cv2，否则纯 numpy)
 # ---------------------------------------------------------------------------
 
 def _rgb_to_hsv_array(rgb: np.ndarray) -> np.ndarray:
     """将 (H, W, 3) uint8 RGB 数组转为 HSV float 数组。
 
     输出范围: H 0-180, S 0-255, V 0-255 (与 OpenCV 约定一致)。
+    先转成连续的 R/G/B 平面，直接在 0-255 的取值上计算 (色相、饱和度只依赖比值)，
+    各步骤原地写入复用缓冲，最后一次交错拷贝成 (H, W, 3)。
+    安装了 OpenCV 时改用 cv2.cvtColor 的浮点路径，再换算到相同的取值范围。
     """
-    rgb_f = rgb.astype(np.float32) / 255.0
-    r, g, b = rgb_f[..., 0], rgb_f[..., 1], rgb_f[..., 2]
+    if cv2 is not None:
+        rgb_f = rgb.astype(np.float32)
+        rgb_f *= 1.0 / 255.0
+        hsv = cv2.cvtColor(rgb_f, cv2.COLOR_RGB2HSV)  # H 0-360, S/V 0-1
+        hsv *= np.array([0.5, 255.0, 255.0], np.float32)
+        return hsv
+
+    planes = np.moveaxis(rgb, -1, 0).astype(np.float32)
+    r, g, b = planes
+
+    hsv = np.empty_like(planes)
+    h, s, v = hsv
+
+    # Value = cmax
+    np.maximum(r, g, out=v)
+    np.maximum(v, b, out=v)
+    delta = np.minimum(r, g)
+    np.minimum(delta, b, out=delta)
+    np.subtract(v, delta, out=delta)
+    nz = delta > 0
+    inv = np.zeros_like(delta)
+    np.divide(1.0, delta, out=inv, where=nz)
+
+    # Saturation = delta / cmax (delta 为 0 时 S 为 0，cmax 为 0 时 delta 必为 0)
+    np.multiply(delta, 255.0, out=s)
+    np.divide(s, v, out=s, where=nz)
+
+    # Hue：按 r、g、b 的顺序写入，后者覆盖前者 (cmax 同时等于多个通道时以 b > g > r 为准)
+    tmp = delta  # delta 之后不再使用，复用为临时缓冲
+    np.subtract(g, b, out=h)
+    h *= inv
+    np.mod(h, 6.0, out=h)
+    np.subtract(b, r, out=tmp)
+    tmp *= inv
+    tmp += 2.0
+    np.copyto(h, tmp, where=(v == g) & nz)
+    np.subtract(r, g, out=tmp)
+    tmp *= inv
+    tmp += 4.0
+    np.copyto(h, tmp, where=(v == b) & nz)
+    h *= 30.0  # 每段 60°，再 0-360 → 0-180
+
+    return np.ascontiguousarray(np.moveaxis(hsv, 0, -1))
+
+
+def _rgb_to_hsv_point(r: int, g: int, b: int) -> tuple:
+    """单个取色点的 RGB → HSV，取值范围同 _rgb_to_hsv_array (H 0-180, S/V 0-255)。
+
+    取色点只有一个像素，直接用标准库 colorsys 标量计算，省去数组分配与 cvtColor 调用开销。
+    """
+    h, s, v = colorsys.rgb_to_hsv(r, g, b)
+    return h * 180.0, s * 255.0, float(v)
 
-    cmax = np.maximum(np.maximum(r, g), b)
-    cmin = np.minimum(np.minimum(r, g), b)
-    delta = cmax - cmin
 
-    # Hue
-    h = np.zeros_like(delta)
-    mask_r = (cmax == r) & (delta > 0)
-    mask_g = (cmax == g) & (delta > 0)
-    mask_b = (cmax == b) & (delta > 0)
-    h[mask_r] = 60.0 * (((g[mask_r] - b[mask_r]) / delta[mask_r]) % 6.0)
-    h[mask_g] = 60.0 * (((b[mask_g] - r[mask_g]) / delta[mask_g]) + 2.0)
-    h[mask_b] = 60.0 * (((r[mask_b] - g[mask_b]) / delta[mask_b]) + 4.0)
-    h = h / 2.0  # 0-360 → 0-180
+def _rgb_to_hsv_u8(rgb: np.ndarray) -> np.ndarray:
+    """与 _rgb_to_hsv_array 取值范围相同，但四舍五入后存为 uint8 (H 0-179)。
 
-    # Saturation
-    safe_cmax = np.where(cmax > 0, cmax, 1.0)
-    s = np.where(cmax > 0, delta / safe_cmax, 0.0) * 255.0
+    整图 HSV 只用于容差比较，uint8 占用内存为 float32 的 1/4，比较时读的字节也更少。
+    """
+    if cv2 is not None:
+        return cv2.cvtColor(np.ascontiguousarray(rgb), cv2.COLOR_RGB2HSV)
+    hsv = _rgb_to_hsv_array(rgb)
+    np.rint(hsv, out=hsv)
+    h = hsv[..., 0]
+    h[h >= 180.0] = 0.0  # 环形：180 与 0 为同一色相
+    return hsv.astype(np.uint8)
+
+
+# 查找表按 (center, tol) 缓存：中心只在增删颜色点时变化，滑块来回拖动时直接复用；
+# 返回的数组设为只读，避免被调用方意外改写
+@lru_cache(maxsize=64)
+def _band_lut(center: float, tol: float) -> np.ndarray:
+    """256 项查找表：uint8 值 x 满足 |x - center| <= tol 时为 True。"""
+    lut = np.zeros(256, dtype=bool)
+    lo = max(0, math.ceil(center - tol))
+    hi = min(255, math.floor(center + tol))
+    if lo <= hi:
+        lut[lo:hi + 1] = True
+    lut.flags.writeable = False
+    return lut
+
+
+@lru_cache(maxsize=64)
+def _hue_band_lut(center: float, tol: float) -> np.ndarray:
+    """256 项查找表：色相 (0-179) 与 center 的环形距离 <= tol 时为 True。
+
+    环形距离与阈值比较合并进同一张表，逐像素只剩一次查表。
+    """
+    lut = np.zeros(256, dtype=bool)
+    lo = math.ceil(center - tol)
+    hi = math.floor(center + tol)
+    if hi - lo >= 179:
+        lut[:180] = True
+    elif lo <= hi:
+        lut[np.arange(lo, hi + 1) % 180] = True
+    lut.flags.writeable = False
+    return lut
 
-    # Value
-    v = cmax * 255.0
 
-    return np.stack([h, s, v], axis=-1)
+def _band_mask(channel: np.ndarray, center: float, tol: float) -> np.ndarray:
+    """uint8 通道中 |x - center| <= tol 的像素。"""
+    return _band_lut(center, tol).take(channel)
 
 
+def _hue_band_mask(h: np.ndarray, center: float, tol: float) -> np.ndarray:
+    """uint8 色相通道 (0-179) 中环形距离 <= tol 的像素。"""
+    return _hue_band_lut(center, tol).take(h)
+
+
+_MASK_TILE_BYTES = 2 << 20  # 容差 mask 按行分块计算，每块 HSV 约 2 MB (与 L2 缓存同量级)
+_MASK_WORKERS = min(8, os.cpu_count() or 1)  # 分块并行计算的线程数 (查表与位运算时 NumPy 释放 GIL)
+_mask_pool = None  # 延迟创建的 ThreadPoolExecutor
+
+
+def _get_mask_pool() -> ThreadPoolExecutor:
+    """容差 mask 分块并行用的线程池，首次需要时才创建。"""
+    global _mask_pool
+    if _mask_pool is None:
+        _mask_pool = ThreadPoolExecutor(max_workers=_MASK_WORKERS)
+    return _mask_pool
+
+
+def _hsv_match_mask(img_hsv: np.ndarray, center, tol, exclude=(), out=None) -> np.ndarray:
+    """uint8 HSV 图像中落在 center ± tol 内的像素 (H 通道为 0-180 的环形距离)。
+
+    容差覆盖整个取值范围的通道 (如 H 容差 >= 90) 恒为 True，直接跳过该通道的比较。
+    按行分块计算，每块的中间结果留在缓存中，不再对整图多次往返内存。
+    exclude 中的布尔蒙版 (切割线、删除区域) 在同一次分块遍历中剔除；
+    out 为可复用的 (H, W) bool 缓冲，省去每次滑块变化的整图分配。
+    多核时各行块分给线程池并行计算，每块只写自己的输出行。
+    """
+    (h_c, s_c, v_c), (h_t, s_t, v_t) = center, tol
+    # 每个通道的判定预先做成 256 项查找表，逐像素只做 uint8 查表，不提升到 float
+    checks = []
+    if h_t < 90:
+        checks.append((0, _hue_band_lut(h_c, h_t)))
+    if s_c - s_t > 0 or s_c + s_t < 255:
+        checks.append((1, _band_lut(s_c, s_t)))
+    if v_c - v_t > 0 or v_c + v_t < 255:
+        checks.append((2, _band_lut(v_c, v_t)))
+
+    h, w = img_hsv.shape[:2]
+    mask = np.empty((h, w), dtype=bool) if out is None else out
+    rows = max(1, _MASK_TILE_BYTES // max(1, w * 3))
+
+    def match_rows(y0):
+        blk = img_hsv[y0:y0 + rows]
+        tile = mask[y0:y0 + rows]
+        if checks:
+            (c0, lut0), rest = checks[0], checks[1:]
+            np.take(lut0, blk[..., c0], out=tile)
+            for c, lut in rest:
+                tile &= lut.take(blk[..., c])
+        else:
+            tile.fill(True)
+        for ex in exclude:
+            # 布尔量上 a & ~b 等价于 a > b，原地计算不产生取反的临时数组
+            np.greater(tile, ex[y0:y0 + rows], out=tile)
+
+    starts = range(0, h, rows)
+    if _MASK_WORKERS > 1 and len(starts) > 1:
+        for _ in _get_mask_pool().map(match_rows, starts):
+            pass
+    else:
+        for y0 in starts:
+            match_rows(y0)
+    return mask
+
+
+def _pool_any(mask: np.ndarray, out_h: int, out_w: int) -> np.ndarray:
+    """把布尔 mask 缩小到 (out_h, out_w)，块内任一像素为 True 则结果为 True。
+
+    用于把整图的切割线/删除蒙版映射到缩略图：细切割线在最近邻采样下会丢失，
+    按块取 any 才能保证缩略图上的分割仍然生效。
+    """
+    h, w = mask.shape
+    ys = np.arange(out_h) * h // out_h
+    xs = np.arange(out_w) * w // out_w
+    return np.logical_or.reduceat(np.logical_or.reduceat(mask, ys, axis=0), xs, axis=1)
+
+
+
+def _segment_spans(x0, y0, x1, y1, radius, h, w):
+    """宽为 2*radius 的线段 (两端为圆头) 在 (h, w) 图像中逐行覆盖的像素区间。
+
+    线段区域是凸的，每行与其相交为一个区间：取两端圆盘与中间矩形带各自区间的并，
+    逐行解析求出端点，不生成包围盒大小的坐标/距离数组。
+    Returns:
+        (ys, x_lo, x_hi) 三个 int 数组，第 ys[i] 行的 x_lo[i]..x_hi[i] (含) 被覆盖
+    """
+    r2 = radius * radius
+    y_lo = max(0, math.ceil(min(y0, y1) - radius))
+    y_hi = min(h - 1, math.floor(max(y0, y1) + radius))
+    if y_lo > y_hi:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty, empty
+    ys = np.arange(y_lo, y_hi + 1)
+    lo = np.full(len(ys), np.inf)
+    hi = np.full(len(ys), -np.inf)
+
+    # 两端圆盘: (x - cx)^2 <= r^2 - (y - cy)^2
+    for cx, cy in ((x0, y0), (x1, y1)):
+        rem = r2 - (ys - cy) ** 2
+        ok = rem >= 0
+        half = np.sqrt(np.where(ok, rem, 0.0))
+        np.minimum(lo, np.where(ok, cx - half, np.inf), out=lo)
+        np.maximum(hi, np.where(ok, cx + half, -np.inf), out=hi)
+
+    # 中间矩形带: 投影参数 t ∈ [0, 1] 且到直线距离 <= r，两者都是 x 的线性约束
+    dx, dy = x1 - x0, y1 - y0
+    seg_len_sq = dx * dx + dy * dy
+    if seg_len_sq >= 1e-6:
+        seg_len = math.sqrt(seg_len_sq)
+        band_lo = np.full(len(ys), -np.inf)
+        band_hi = np.full(len(ys), np.inf)
+        # a * x + b ∈ [c_lo, c_hi]，a 为常数，b 随行变化
+        for a, b, c_lo, c_hi in ((dx, (ys - y0) * dy - x0 * dx, 0.0, seg_len_sq),
+                                 (dy, -(ys - y0) * dx - x0 * dy,
+                                  -radius * seg_len, radius * seg_len)):
+            if a > 0:
+                np.maximum(band_lo, (c_lo - b) / a, out=band_lo)
+                np.minimum(band_hi, (c_hi - b) / a, out=band_hi)
+            elif a < 0:
+                np.maximum(band_lo, (c_hi - b) / a, out=band_lo)
+                np.minimum(band_hi, (c_lo - b) / a, out=band_hi)
+            else:
+                outside = (b < c_lo) | (b > c_hi)
+                band_lo[outside] = np.inf
+                band_hi[outside] = -np.inf
+        has_band = band_lo <= band_hi
+        np.minimum(lo, np.where(has_band, band_lo, np.inf), out=lo)
+        np.maximum(hi, np.where(has_band, band_hi, -np.inf), out=hi)
+
+    # 恰好落在边界上的像素计入 (与 dist_sq <= r^2 一致)，容忍除法的舍入误差
+    x_lo = np.maximum(np.ceil(lo - 1e-9), 0)
+    x_hi = np.minimum(np.floor(hi + 1e-9), w - 1)
+    keep = x_lo <= x_hi
+    return ys[keep], x_lo[keep].astype(np.intp), x_hi[keep].astype(np.intp)
+
+
+def _drag_rect(canvas, tag, x0, y0, x1, y1, **opts):
+    """拖拽框选时更新矩形：已存在时只改坐标，否则按 opts 新建 (鼠标移动时不再删除重建 item)。"""
+    found = canvas.find_withtag(tag)
+    if found:
+        canvas.coords(found[0], x0, y0, x1, y1)
+    else:
+        canvas.create_rectangle(x0, y0, x1, y1, tags=tag, **opts)
+
 # ---------------------------------------------------------------------------
 # 颜色分析窗口
 # ---------------------------------------------------------------------------
@@ -661,6 +1014,9 @@ class ColorAnalysisWindow(tk.Toplevel):
         (170, 110, 40),  (255, 250, 200), (128, 0, 0),     (170, 255, 195),
         (128, 128, 0),   (255, 215, 180), (0, 0, 128),     (128, 128, 128),
     ]
+    # 预览画布上分组矩形的颜色，按分组序号循环取用
+    _GROUP_COLORS = ("#00FF00", "#FF6600", "#00CCFF", "#FF00FF",
+                     "#FFFF00", "#00FF80", "#8080FF", "#FF8080")
 
     def __init__(self, parent, app, color_points):
         """
@@ -675,40 +1031,26 @@ class ColorAnalysisWindow(tk.Toplevel):
         self.color_points = list(color_points)
         n_pts = len(self.color_points)
 
-        # 预计算整张图的 HSV
-        img_arr = np.array(app.pil_image)  # (H, W, 3) uint8
+        # asarray 直接包装 PIL 导出的像素缓冲 (只读)，不再额外拷贝一份；下游只读不写
+        img_arr = np.asarray(app.pil_image)  # (H, W, 3) uint8
+        if img_arr.dtype != np.uint8 or img_arr.ndim != 3:
+            img_arr = np.asarray(app.pil_image.convert("RGB"))
         self.img_rgb = img_arr
-        self.img_hsv = _rgb_to_hsv_array(img_arr)
+        # 整图 HSV 延迟到首次计算 mask 时生成 (见 _ensure_full_hsv)，窗口先完成构建
+        self.img_hsv: np.ndarray | None = None
         self.img_h_total, self.img_w_total = img_arr.shape[:2]
 
-        # 计算每个取色点的 HSV
-        pts_arr = np.array(self.color_points, dtype=np.uint8).reshape(1, n_pts, 3)
-        pts_hsv = _rgb_to_hsv_array(pts_arr)[0]  # (n_pts, 3)
-        h_vals = pts_hsv[:, 0]
-        s_vals = pts_hsv[:, 1]
-        v_vals = pts_hsv[:, 2]
-
-        # H 通道的环形平均
-        h_rad = h_vals * (np.pi / 90.0)  # 0-180 → 0-2π
-        mean_sin = np.mean(np.sin(h_rad))
-        mean_cos = np.mean(np.cos(h_rad))
-        self.center_h = float(np.arctan2(mean_sin, mean_cos) * (90.0 / np.pi)) % 180.0
-        self.center_s = float(np.mean(s_vals))
-        self.center_v = float(np.mean(v_vals))
-
-        # 平均 RGB (用于显示色块)
-        avg_r = int(round(sum(p[0] for p in self.color_points) / n_pts))
-        avg_g = int(round(sum(p[1] for p in self.color_points) / n_pts))
-        avg_b = int(round(sum(p[2] for p in self.color_points) / n_pts))
-        self.center_rgb = (avg_r, avg_g, avg_b)
+        # 颜色点按列存储: (N, 3) uint8 RGB 与 (N, 3) float HSV，前 len(color_points) 个为原始取色点；
+        # 另有求和累加器，添加/撤销颜色点时只增减单个点
+        self._color_buf = np.asarray(self.color_points, dtype=np.uint8).reshape(-1, 3)
+        self._color_hsv = np.array([_rgb_to_hsv_point(*p) for p in self.color_points],
+                                   dtype=float).reshape(-1, 3)
+        self._color_sums = self._color_terms(self._color_buf, self._color_hsv)
+        self._update_center()
 
         # 根据取色点散布计算初始容差
         if n_pts > 1:
-            h_diffs = np.abs(h_vals - self.center_h)
-            h_diffs = np.minimum(h_diffs, 180.0 - h_diffs)
-            init_h = int(min(90, max(5, np.max(h_diffs) * 1.5 + 5)))
-            init_s = int(min(128, max(10, np.max(np.abs(s_vals - self.center_s)) * 1.5 + 10)))
-            init_v = int(min(128, max(10, np.max(np.abs(v_vals - self.center_v)) * 1.5 + 10)))
+            init_h, init_s, init_v = self._spread_tol()
         else:
             init_h, init_s, init_v = 15, 50, 50
         self._init_tol = (init_h, init_s, init_v)
@@ -718,14 +1060,33 @@ class ColorAnalysisWindow(tk.Toplevel):
                     self._PREVIEW_MAX / self.img_h_total, 1.0)
         self.thumb_w = max(1, int(self.img_w_total * scale))
         self.thumb_h = max(1, int(self.img_h_total * scale))
+        # 从金字塔中不小于缩略图的最小一层缩小，不必每次打开窗口都从原图重采样
         self.thumb_rgb = np.array(
-            app.pil_image.resize((self.thumb_w, self.thumb_h), Image.BILINEAR)
+            app._pyramid_source(self.thumb_w, self.thumb_h).resize(
+                (self.thumb_w, self.thumb_h), Image.BILINEAR)
         )
+        # 缩略图 HSV 只算一次；滑块拖动时在缩略图分辨率上做阈值/连通域 (快速预览)
+        self.img_hsv_thumb = _rgb_to_hsv_u8(self.thumb_rgb)
+        self.px2thumb = (self.thumb_w * self.thumb_h) / (self.img_w_total * self.img_h_total)
+        # 缩略图每个像素中心对应的原图行/列 (最近邻采样 labeled 用)
+        self._thumb_ys = ((np.arange(self.thumb_h) + 0.5) * (self.img_h_total / self.thumb_h)).astype(np.intp)
+        self._thumb_xs = ((np.arange(self.thumb_w) + 0.5) * (self.img_w_total / self.thumb_w)).astype(np.intp)
+        self._preview_is_fast = False  # 当前结果是否来自缩略图 (面积/质心为近似值)
+        self._preview_params = None    # 当前结果对应的 (h_tol, s_tol, v_tol, min_area)
 
         # 连通域结果缓存
-        self.particle_areas: list[int] = []
+        self.particle_areas = np.zeros(0, dtype=np.int64)  # 各颗粒像素面积 (按面积降序)
         self.mask: np.ndarray | None = None
+        # 容差 mask / 连通域标记的复用缓冲，按 (用途, 尺寸) 保存，快速预览与原图计算各用一份
+        self._work_bufs: dict = {}
+        # 连通域标记缓存 (labeled, num_features, areas) 及其对应的阈值/蒙版状态
+        self._label_cache_key = None
+        self._label_cache = None
+        self._exclude_version = 0  # 切割线/删除蒙版每次变化时加 1，使标记缓存失效
         self._overlay_pil: Image.Image | None = None
+        self._overlay_buf = np.empty_like(self.thumb_rgb)  # 遮罩混合的复用缓冲
+        self._overlay_version = 0  # 每次生成新的遮罩预览图时加 1
+        self._render_key = None    # 上次渲染到画布的 (可见范围, 尺寸, 采样方式, 遮罩版本)
         self._centroids_thumb: list[tuple[float, float]] = []
 
         # 预览缩放/平移状态
@@ -736,7 +1097,9 @@ class ColorAnalysisWindow(tk.Toplevel):
 
         # 手动分割状态
         self._cut_mask = np.zeros((self.img_h_total, self.img_w_total), dtype=bool)
-        self._cut_strokes: list[np.ndarray] = []
+        # 每个像素被多少条笔画覆盖；撤销时只需更新该笔画覆盖的像素
+        self._cut_refcount = np.zeros((self.img_h_total, self.img_w_total), dtype=np.uint16)
+        self._cut_strokes: list[list[tuple]] = []  # 每条笔画为各线段的 (ys, x_lo, x_hi) 区间
 
         # 颗粒删除状态
         self._delete_mask = np.zeros((self.img_h_total, self.img_w_total), dtype=bool)
@@ -748,7 +1111,6 @@ class ColorAnalysisWindow(tk.Toplevel):
 
         # 添加颜色点状态
         self._add_color_mode = False
-        self._added_colors: list[tuple[int, int, int]] = []  # 新添加的 (R, G, B) 列表
 
         # 分组状态
         self._ca_groups: list[tuple[str, float, float, float, float]] = []  # (name, x1, y1, x2, y2) 图像坐标
@@ -861,12 +1223,24 @@ class ColorAnalysisWindow(tk.Toplevel):
         ttk.Label(desc_area_row, text=self._t("ca_min_area_desc"),
                   foreground="gray", font=("", 8)).pack(side=tk.LEFT, padx=(8, 0))
 
+        # 快速预览 / 精确计算
+        row_fast = ttk.Frame(tol_frame)
+        row_fast.pack(fill=tk.X, pady=(2, 0))
+        self._fast_preview = tk.BooleanVar(value=True)
+        ttk.Checkbutton(row_fast, text=self._t("ca_fast_preview"),
+                        variable=self._fast_preview,
+                        command=self._update_preview).pack(side=tk.LEFT, padx=2)
+        ttk.Button(row_fast, text=self._t("ca_refine"),
+                   command=self._refine).pack(side=tk.LEFT, padx=2)
+        ttk.Label(row_fast, text=self._t("ca_fast_preview_desc"),
+                  foreground="gray", font=("", 8)).pack(side=tk.LEFT, padx=(8, 0))
+
         # ---- 预览画布 ----
         pf = ttk.LabelFrame(self, text=self._t("ca_preview"), padding=4)
         pf.pack(fill=tk.BOTH, expand=True, padx=6, pady=2)
         self.preview_canvas = tk.Canvas(pf, bg="#222222", highlightthickness=0)
         self.preview_canvas.pack(fill=tk.BOTH, expand=True)
-        self.preview_canvas.bind("<Configure>", lambda e: self._render_preview())
+        self.preview_canvas.bind("<Configure>", self._on_preview_configure)
         # 预览缩放 & 平移
         self.preview_canvas.bind("<MouseWheel>", self._pv_on_scroll)
         self.preview_canvas.bind("<Button-4>", self._pv_on_scroll_up)
@@ -889,6 +1263,7 @@ class ColorAnalysisWindow(tk.Toplevel):
         ttk.Label(bottom, textvariable=self.stat_var, justify=tk.LEFT).pack(anchor=tk.W)
 
         list_frame = ttk.LabelFrame(bottom, text=self._t("ca_particle_list"), padding=4)
+        self._list_frame = list_frame
         list_frame.pack(fill=tk.BOTH, expand=True, pady=(4, 4))
 
         unit = self._area_unit_str()
@@ -972,66 +1347,166 @@ class ColorAnalysisWindow(tk.Toplevel):
 
         # 防抖定时器 id
         self._pending_update: str | None = None
+        self._resize_after: str | None = None
+        self._poll_after: str | None = None  # 轮询后台计算结果的定时器 id
+        # 后台计算：单个工作线程，任务按提交顺序执行；_compute_seq 标记最新一次提交
+        self._compute_pool = ThreadPoolExecutor(max_workers=1)
+        self._compute_future = None
+        # 已提交且可能仍在运行的全部任务 (cancel() 对已开始的任务无效，需逐个等待)
+        self._compute_futures = []
+        self._closed = False  # 窗口已销毁；之后开始的计算任务直接放弃
+        self._compute_seq = 0
+        self.bind("<Destroy>", self._on_destroy, add="+")
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            # 取消所有待执行的定时回调，并作废序号，关闭窗口后才完成的计算结果直接丢弃
+            for after_id in (self._pending_update, self._resize_after, self._poll_after):
+                if after_id is not None:
+                    self.after_cancel(after_id)
+            self._pending_update = self._resize_after = self._poll_after = None
+            self._closed = True
+            # 排队中的任务取消，正在运行的任务等待其结束，之后不再有线程写本窗口的缓冲
+            self._wait_compute()
+            self._compute_pool.shutdown(wait=False)
 
     # --------------------------------------------------------- 计算逻辑
     def _on_slider_change(self):
-        """滑块变化时使用 after 防抖，避免频繁重算。"""
+        """滑块变化时使用 after 防抖，避免频繁重算；防抖结束后在后台线程计算。"""
         if self._pending_update is not None:
             self.after_cancel(self._pending_update)
-        self._pending_update = self.after(80, self._update_preview)
+        self._pending_update = self.after(80, self._update_preview_async)
 
-    def _compute_mask(self):
-        """根据当前 HSV 中心和容差计算二值 mask、标记数组、面积列表和质心列表。
+    def _compute_params(self, refine=False):
+        """在主线程读取 Tk 变量，返回 (fast, (h_tol, s_tol, v_tol, min_area))。"""
+        fast = (not refine and self._fast_preview.get() and self.px2thumb < 1.0)
+        return fast, (self.h_tol.get(), self.s_tol.get(), self.v_tol.get(),
+                      self.min_area.get())
 
-        Returns:
-            (mask, labeled_remapped, areas_list, centroids)
-            labeled_remapped 中 1=最大颗粒, 2=次大, …
-            centroids 为 [(cx, cy), …] 对应每个颗粒 (图像坐标)
-        """
-        h_tol = self.h_tol.get()
-        s_tol = self.s_tol.get()
-        v_tol = self.v_tol.get()
-        min_a = self.min_area.get()
-
-        h_img = self.img_hsv[..., 0]
-        s_img = self.img_hsv[..., 1]
-        v_img = self.img_hsv[..., 2]
-
-        # H 通道环形距离 (0-180 范围)
-        h_diff = np.abs(h_img - self.center_h)
-        h_diff = np.minimum(h_diff, 180.0 - h_diff)
-        h_match = h_diff <= h_tol
+    def _update_preview_async(self):
+        """在工作线程中计算 mask (NumPy/SciPy 计算时释放 GIL)，主线程轮询结果后刷新界面。
 
-        s_match = np.abs(s_img - self.center_s) <= s_tol
-        v_match = np.abs(v_img - self.center_v) <= v_tol
+        新的滑块事件会让尚未完成的旧任务作废，只应用最后一次提交的结果。
+        """
+        self._pending_update = None
+        fast, params = self._compute_params()
+        # 尚未开始的旧任务直接取消；已在运行的留在列表中，由 _wait_compute 等待
+        futures = [f for f in self._compute_futures if not f.done()]
+        for f in futures:
+            f.cancel()
+        self._compute_seq += 1
+        self._compute_future = self._compute_pool.submit(self._compute_mask, fast, params)
+        futures.append(self._compute_future)
+        self._compute_futures = futures
+        if self._poll_after is not None:
+            self.after_cancel(self._poll_after)
+        self._poll_after = self.after(15, self._poll_compute, self._compute_seq, fast, params)
+
+    def _poll_compute(self, seq, fast, params):
+        self._poll_after = None
+        if seq != self._compute_seq:
+            return  # 已被更新的任务取代
+        fut = self._compute_future
+        if not fut.done():
+            self._poll_after = self.after(15, self._poll_compute, seq, fast, params)
+            return
+        self._compute_future = None
+        if not fut.cancelled():
+            self._apply_compute_result(fast, params, fut.result())
 
-        mask = h_match & s_match & v_match
+    def _wait_compute(self):
+        """作废并等待全部后台任务。
 
-        # 应用手动分割切割线
-        if self._cut_mask.any():
-            mask = mask & ~self._cut_mask
+        同步重算或修改切割/删除蒙版前调用；返回时没有任何工作线程仍在读写
+        复用缓冲、标记缓存和排除蒙版。
+        """
+        self._compute_seq += 1
+        self._compute_future = None
+        futures, self._compute_futures = self._compute_futures, []
+        for fut in futures:
+            if not fut.cancel():
+                try:
+                    fut.result()
+                except Exception:
+                    pass  # 结果已作废，异常会在接下来的同步计算中重现
+
+    def _work_buffer(self, name, shape, dtype):
+        """返回 _compute_mask 的中间结果缓冲，同一用途和尺寸只分配一次。"""
+        buf = self._work_bufs.get((name, shape))
+        if buf is None:
+            buf = self._work_bufs[(name, shape)] = np.empty(shape, dtype=dtype)
+        return buf
+
+    def _ensure_full_hsv(self):
+        """返回整图 uint8 HSV，首次调用时才从 img_rgb 转换。"""
+        if self.img_hsv is None:
+            self.img_hsv = _rgb_to_hsv_u8(self.img_rgb)
+        return self.img_hsv
+
+    def _compute_mask(self, fast=False, params=None, full_labels=False):
+        """根据当前 HSV 中心和容差计算二值 mask、标记数组、面积列表和质心列表。
 
-        # 应用颗粒删除蒙版
-        if self._delete_mask.any():
-            mask = mask & ~self._delete_mask
+        fast=True 时在缩略图分辨率上计算，面积按像素比例换算回原图像素，质心换算回图像坐标。
+        面积与质心总在计算分辨率上求得；返回的 mask/labeled 只用于预览，默认为缩略图尺寸，
+        full_labels=True 时返回计算分辨率的标记 (删除颗粒时才需要)。
+        params 为主线程预先读出的 (h_tol, s_tol, v_tol, min_area)；在工作线程中调用时必须给出，
+        不能在线程里读 Tk 变量。
 
-        labeled, num_features = ndimage_label(mask)
-        empty_labeled = np.zeros_like(mask, dtype=np.int32)
+        Returns:
+            (mask, labeled_remapped, areas, centroids)
+            areas 为 int64 数组 (原图像素面积，降序)
+            labeled_remapped 中 1=最大颗粒, 2=次大, …
+            centroids 为 [(cx, cy), …] 对应每个颗粒 (图像坐标)
+        """
+        from scipy.ndimage import label as ndimage_label
+
+        if self._closed:
+            return None  # 窗口已关闭，结果不会再被使用
+        if params is None:
+            params = self._compute_params()[1]
+        h_tol, s_tol, v_tol, min_a = params
+
+        if fast:
+            img_hsv = self.img_hsv_thumb
+            if min_a > 0:
+                min_a = max(1, int(round(min_a * self.px2thumb)))
+        else:
+            img_hsv = self._ensure_full_hsv()
+        shape = img_hsv.shape[:2]
+        out_shape = shape if fast or full_labels else (self.thumb_h, self.thumb_w)
+
+        # 只改动最小面积时，阈值与连通域标记结果不变，直接复用缓存重新过滤
+        cache_key = (fast, h_tol, s_tol, v_tol,
+                     self.center_h, self.center_s, self.center_v, self._exclude_version)
+        if self._label_cache_key == cache_key:
+            labeled, num_features, areas, fg = self._label_cache
+        else:
+            # 手动分割切割线与颗粒删除蒙版，在阈值判定的同一遍中剔除
+            exclude = [m if not fast else _pool_any(m, *shape)
+                       for m in (self._cut_mask, self._delete_mask) if m.any()]
+            fg = _hsv_match_mask(img_hsv,
+                                   (self.center_h, self.center_s, self.center_v),
+                                   (h_tol, s_tol, v_tol),
+                                   exclude=exclude, out=self._work_buffer("mask", shape, bool))
+
+            # 标记写入复用缓冲 (旧的标记缓存随即作废，缓冲中的旧内容不再被引用)
+            labeled = self._work_buffer("labeled", shape, np.int32)
+            num_features = ndimage_label(fg, output=labeled)
+            # 计算每个连通域面积 (labeled 连续，ravel 不拷贝；bincount 单次遍历即得全部面积，
+            # 比 ndimage.sum_labels 按 index 逐个归约快约 3 倍)
+            areas = np.bincount(labeled.ravel(), minlength=num_features + 1)[1:]
+            self._label_cache_key = cache_key
+            self._label_cache = (labeled, num_features, areas, fg)
 
         if num_features == 0:
-            return mask, empty_labeled, [], []
+            return (np.zeros(out_shape, dtype=bool), np.zeros(out_shape, dtype=np.int32),
+                    np.zeros(0, dtype=np.int64), [])
 
-        # 计算每个连通域面积
         component_ids = np.arange(1, num_features + 1)
-        areas = np.bincount(labeled.ravel(), minlength=num_features + 1)[1:]
 
         # 过滤小面积
         if min_a > 0:
             keep = areas >= min_a
-            remove_ids = component_ids[~keep]
-            if len(remove_ids) > 0:
-                remove_mask = np.isin(labeled, remove_ids)
-                mask[remove_mask] = False
             kept_ids = component_ids[keep]
             kept_areas = areas[keep]
         else:
@@ -1039,63 +1514,86 @@ class ColorAnalysisWindow(tk.Toplevel):
             kept_areas = areas
 
         if len(kept_areas) == 0:
-            return mask, empty_labeled, [], []
+            return (np.zeros(out_shape, dtype=bool), np.zeros(out_shape, dtype=np.int32),
+                    np.zeros(0, dtype=np.int64), [])
 
         # 按面积降序排序
         order = np.argsort(kept_areas)[::-1]
         kept_areas = kept_areas[order]
         kept_ids = kept_ids[order]
 
-        # 重映射标签: 1=最大, 2=次大, …
+        # 重映射标签: 1=最大, 2=次大, …；被过滤的小颗粒映射为 0，
+        # 一次查表同时完成小面积剔除与重编号
         remap = np.zeros(num_features + 1, dtype=np.int32)
-        for new_id, old_id in enumerate(kept_ids, 1):
-            remap[old_id] = new_id
-        labeled_remapped = remap[labeled]
+        remap[kept_ids] = np.arange(1, len(kept_ids) + 1, dtype=np.int32)
 
-        # 用 bincount 计算每个颗粒质心
+        # 质心：只取前景像素的坐标做加权 bincount，不再生成整图的 mgrid 坐标数组
         n = len(kept_areas)
-        img_h, img_w = labeled_remapped.shape
-        y_coords, x_coords = np.mgrid[:img_h, :img_w]
-        flat = labeled_remapped.ravel()
-        counts = np.bincount(flat, minlength=n + 1)
-        sum_x = np.bincount(flat, weights=x_coords.ravel(), minlength=n + 1)
-        sum_y = np.bincount(flat, weights=y_coords.ravel(), minlength=n + 1)
-        centroids = []
-        for i in range(1, n + 1):
-            if counts[i] > 0:
-                centroids.append((sum_x[i] / counts[i], sum_y[i] / counts[i]))
-            else:
-                centroids.append((0.0, 0.0))
+        img_w = shape[1]
+        # 在 1 字节/像素的阈值 mask 上找前景位置，只对这些像素查表得到新标签，
+        # 不生成整图尺寸的重映射标记数组
+        flat_idx = np.flatnonzero(fg)
+        flat_lbl = remap.take(labeled.ravel().take(flat_idx))
+        if n < num_features:
+            kept_px = flat_lbl != 0  # 去掉被面积过滤的小颗粒像素
+            flat_idx = flat_idx[kept_px]
+            flat_lbl = flat_lbl[kept_px]
+            del kept_px
+        ys, xs = np.divmod(flat_idx, img_w)
+        del flat_idx  # 坐标已拆出，先释放索引数组，降低 bincount 期间的内存峰值
+        sum_x = np.bincount(flat_lbl, weights=xs, minlength=n + 1)[1:]
+        del xs
+        sum_y = np.bincount(flat_lbl, weights=ys, minlength=n + 1)[1:]
+        del ys, flat_lbl
+        # 每个保留颗粒的像素数即 kept_areas (均 >= 1)
+        cx = sum_x / kept_areas
+        cy = sum_y / kept_areas
+        if fast:
+            # 缩略图像素中心换算回原图坐标，面积按像素比例放大
+            cx = (cx + 0.5) * (self.img_w_total / self.thumb_w) - 0.5
+            cy = (cy + 0.5) * (self.img_h_total / self.thumb_h) - 0.5
+            kept_areas = np.rint(kept_areas / self.px2thumb).astype(np.int64)
+        centroids = list(zip(cx.tolist(), cy.tolist()))
+
+        if out_shape == shape:
+            labeled_remapped = remap.take(labeled)
+        else:
+            # 最近邻缩小到缩略图尺寸：先按预先算好的行列索引取样，再查表重编号
+            labeled_remapped = remap.take(labeled[self._thumb_ys[:, None], self._thumb_xs[None, :]])
+        return labeled_remapped != 0, labeled_remapped, kept_areas.astype(np.int64, copy=False), centroids
 
-        return mask, labeled_remapped, kept_areas.tolist(), centroids
+    def _update_preview(self, refine=False):
+        """重算 mask，更新预览画布、统计和颗粒列表。
 
-    def _update_preview(self):
-        """重算 mask，更新预览画布、统计和颗粒列表。"""
+        勾选快速预览且缩略图小于原图时在缩略图上计算；refine=True 时强制按原图计算。
+        """
         self._pending_update = None
-        self.mask, labeled, self.particle_areas, centroids_full = self._compute_mask()
-        self._labeled = labeled  # 保存标记数组，用于颗粒删除
+        fast, params = self._compute_params(refine)
+        self._wait_compute()
+        self._apply_compute_result(fast, params, self._compute_mask(fast, params))
+
+    def _apply_compute_result(self, fast, params, result):
+        """用 _compute_mask 的结果刷新预览画布、统计和颗粒列表 (只在主线程调用)。"""
+        self.mask, labeled_thumb, self.particle_areas, centroids_full = result
+        self._labeled = labeled_thumb  # 缩略图尺寸的标记数组，用于颗粒删除
+        self._preview_is_fast = fast
+        self._preview_params = params  # 删除颗粒时按同一参数重建原图标记
         n_particles = len(self.particle_areas)
 
         # -- 生成彩色遮罩预览图 (缩略图尺寸) --
-        # 缩小 labeled 到缩略图尺寸
-        labeled_pil = Image.fromarray(labeled.astype(np.int32), mode="I")
-        labeled_thumb = np.array(
-            labeled_pil.resize((self.thumb_w, self.thumb_h), Image.NEAREST),
-            dtype=np.int32,
-        )
 
-        overlay = self.thumb_rgb.copy()
-        for i in range(1, n_particles + 1):
-            color = np.array(
-                self._PALETTE[(i - 1) % len(self._PALETTE)], dtype=np.float32
-            )
-            region = labeled_thumb == i
-            if region.any():
-                overlay[region] = (
-                    overlay[region] * 0.4 + color * 0.6
-                ).astype(np.uint8)
+        # 颗粒 i 的颜色为 _PALETTE[(i-1) % len]；按标签查表一次混合全部前景像素
+        # (在复用的缓冲上混合，不再每次复制一份新的缩略图数组)
+        overlay = self._overlay_buf
+        np.copyto(overlay, self.thumb_rgb)
+        if n_particles > 0:
+            palette = np.asarray(self._PALETTE, dtype=np.float32) * 0.6
+            color_lut = palette[np.arange(-1, n_particles) % len(palette)]
+            fg = labeled_thumb != 0
+            overlay[fg] = (overlay[fg] * 0.4 + color_lut[labeled_thumb[fg]]).astype(np.uint8)
 
         self._overlay_pil = Image.fromarray(overlay)
+        self._overlay_version += 1
 
         # 将质心从原图坐标换算到缩略图坐标
         sx = self.thumb_w / self.img_w_total
@@ -1111,7 +1609,7 @@ class ColorAnalysisWindow(tk.Toplevel):
         self._assign_ca_groups()
 
         # -- 统计 --
-        total_px = int(np.sum(self.particle_areas)) if n_particles > 0 else 0
+        total_px = int(self.particle_areas.sum())
         total_pixels = self.img_h_total * self.img_w_total
         coverage = total_px / total_pixels * 100.0 if total_pixels > 0 else 0.0
 
@@ -1125,23 +1623,36 @@ class ColorAnalysisWindow(tk.Toplevel):
         else:
             total_area_str = self._t("ca_total_area_px", a=total_px)
 
-        self.stat_var.set(
+        stat_text = (
             f"{self._t('ca_particle_count', n=n_particles)}  |  "
             f"{total_area_str}  |  "
             f"{self._t('ca_coverage', c=coverage)}"
         )
+        list_title = self._t("ca_particle_list")
+        if self._preview_is_fast:
+            # 快速预览的颗粒数/面积/覆盖率与颗粒列表来自缩略图，明确标注为近似值
+            stat_text += f"  |  {self._t('ca_approx')}"
+            list_title += f" ({self._t('ca_approx')})"
+        self.stat_var.set(stat_text)
+        self._list_frame.config(text=list_title)
 
         # -- 颗粒列表 --
         self.ptree.delete(*self.ptree.get_children())
         self.ptree.heading("ca_col_area", text=self._t("ca_col_area", u=unit))
-        for i, a_px in enumerate(self.particle_areas, 1):
-            if has_scale:
-                val = f"{a_px * area_factor:.2f}"
-            else:
-                val = str(a_px)
+        # 面积换算在数组上一次完成，循环里只做格式化
+        if has_scale:
+            vals = [f"{v:.2f}" for v in (self.particle_areas * area_factor).tolist()]
+        else:
+            vals = [str(a) for a in self.particle_areas.tolist()]
+        for i, val in enumerate(vals, 1):
             grp = self._ca_group_labels[i - 1] if i - 1 < len(self._ca_group_labels) else ""
             self.ptree.insert("", tk.END, iid=str(i), values=(i, val, grp))
 
+    def _refine(self):
+        """按原图分辨率重算 (快速预览的面积/质心为近似值，统计与导出前调用)。"""
+        if self._preview_is_fast:
+            self._update_preview(refine=True)
+
     # --------------------------------------------------------- 颗粒删除
     def _start_delete_mode(self):
         """启动框选删除模式。"""
@@ -1164,11 +1675,26 @@ class ColorAnalysisWindow(tk.Toplevel):
         """根据颗粒编号列表 (1-based) 删除颗粒。"""
         if not ids:
             return
-        batch_mask = np.zeros_like(self._delete_mask)
-        for pid in ids:
-            batch_mask |= (self._labeled == pid)
+        selected = np.zeros(len(self.particle_areas) + 1, dtype=bool)
+        selected[ids] = True
+        # 删除蒙版总在原图分辨率的标记上生成 (按当前结果的参数重建，非快速预览时通常命中标记缓存)
+        self._wait_compute()
+        _, labeled, full_areas, _ = self._compute_mask(False, self._preview_params, full_labels=True)
+        if self._preview_is_fast:
+            # 快速预览的编号属于缩略图上的颗粒，与原图颗粒不一一对应；直接放大缩略图标记
+            # 会在颗粒边缘留下碎片。改为把选中颗粒放大回原图，与之重叠的原图颗粒整体删除
+            ys = np.arange(self.img_h_total) * self.thumb_h // self.img_h_total
+            xs = np.arange(self.img_w_total) * self.thumb_w // self.img_w_total
+            hit = selected.take(self._labeled)[np.ix_(ys, xs)]
+            selected = np.zeros(len(full_areas) + 1, dtype=bool)
+            selected[labeled[hit]] = True
+            selected[0] = False
+            del hit
+        batch_mask = selected.take(labeled)
+        del labeled
         self._delete_history.append(batch_mask)
         self._delete_mask |= batch_mask
+        self._exclude_version += 1
         self._group_hint_var.set(self._t("ca_deleted_fmt", n=len(ids)))
         self._update_preview()
 
@@ -1185,12 +1711,16 @@ class ColorAnalysisWindow(tk.Toplevel):
         if not self._delete_history:
             self._group_hint_var.set(self._t("ca_no_delete_undo"))
             return
+        from scipy.ndimage import label as ndimage_label
+
         last = self._delete_history.pop()
         n_restored = len(np.unique(ndimage_label(last)[0])) - 1  # 估算恢复颗粒数
-        # 重建删除蒙版
+        # 重建删除蒙版 (先等后台任务结束，蒙版改完后再更新版本号)
+        self._wait_compute()
         self._delete_mask = np.zeros((self.img_h_total, self.img_w_total), dtype=bool)
         for dm in self._delete_history:
             self._delete_mask |= dm
+        self._exclude_version += 1
         self._group_hint_var.set(self._t("ca_undo_delete_fmt", n=max(1, n_restored)))
         self._update_preview()
 
@@ -1358,8 +1888,12 @@ class ColorAnalysisWindow(tk.Toplevel):
         r, g, b = self.img_rgb[iy, ix]
         new_color = (int(r), int(g), int(b))
 
-        # 添加到列表
-        self._added_colors.append(new_color)
+        # 追加到颜色点缓冲
+        new_rgb = np.array([new_color], dtype=np.uint8)
+        new_hsv = np.array([_rgb_to_hsv_point(*new_color)])
+        self._color_buf = np.vstack([self._color_buf, new_rgb])
+        self._color_hsv = np.vstack([self._color_hsv, new_hsv])
+        self._color_sums += self._color_terms(new_rgb, new_hsv)
 
         # 重新计算 HSV 中心
         self._recalculate_hsv_center()
@@ -1368,7 +1902,7 @@ class ColorAnalysisWindow(tk.Toplevel):
         self._update_color_swatches()
 
         # 更新提示
-        total_n = len(self.color_points) + len(self._added_colors)
+        total_n = len(self._color_buf)
         self._add_color_hint_var.set(self._t("ca_color_added", n=total_n))
 
         # 刷新预览
@@ -1376,11 +1910,13 @@ class ColorAnalysisWindow(tk.Toplevel):
 
     def _undo_add_color(self):
         """撤销最后一个添加的颜色点。"""
-        if not self._added_colors:
+        if len(self._color_buf) <= len(self.color_points):
             self._add_color_hint_var.set(self._t("ca_no_color_undo"))
             return
 
-        self._added_colors.pop()
+        self._color_sums -= self._color_terms(self._color_buf[-1:], self._color_hsv[-1:])
+        self._color_buf = self._color_buf[:-1]
+        self._color_hsv = self._color_hsv[:-1]
 
         # 重新计算 HSV 中心
         self._recalculate_hsv_center()
@@ -1389,41 +1925,50 @@ class ColorAnalysisWindow(tk.Toplevel):
         self._update_color_swatches()
 
         # 更新提示
-        total_n = len(self.color_points) + len(self._added_colors)
+        total_n = len(self._color_buf)
         self._add_color_hint_var.set(self._t("ca_color_undone", n=total_n))
 
         # 刷新预览
         self._update_preview()
 
+    @staticmethod
+    def _color_terms(rgb, hsv):
+        """一组颜色点对累加器的贡献之和: (Σsin h, Σcos h, Σs, Σv, Σr, Σg, Σb)。
+
+        rgb、hsv 均为 (N, 3) 数组，h 为 0-180 的色相。
+        """
+        # 颜色点通常只有几个到几十个，标量 math.sin/cos 比 NumPy 的逐次调用开销更小
+        h_rad = [h * (math.pi / 90.0) for h in hsv[:, 0].tolist()]  # 0-180 → 0-2π
+        return np.concatenate([[math.fsum(map(math.sin, h_rad)), math.fsum(map(math.cos, h_rad))],
+                               hsv[:, 1:].sum(axis=0), rgb.sum(axis=0, dtype=np.int64)])
+
+    def _update_center(self):
+        """由累加器得出 HSV 中心 (H 取环形平均) 与平均 RGB。"""
+        n_pts = len(self._color_buf)
+        sum_sin, sum_cos, sum_s, sum_v, sum_r, sum_g, sum_b = self._color_sums.tolist()
+        self.center_h = math.atan2(sum_sin, sum_cos) * (90.0 / math.pi) % 180.0
+        self.center_s = sum_s / n_pts
+        self.center_v = sum_v / n_pts
+        self.center_rgb = (int(round(sum_r / n_pts)), int(round(sum_g / n_pts)),
+                           int(round(sum_b / n_pts)))
+
+    def _spread_tol(self):
+        """根据各颜色点相对中心的散布给出 (H, S, V) 容差。"""
+        h_vals, s_vals, v_vals = self._color_hsv.T
+        h_diffs = np.abs(h_vals - self.center_h)
+        h_diffs = np.minimum(h_diffs, 180.0 - h_diffs)
+        return (int(min(90, max(5, np.max(h_diffs) * 1.5 + 5))),
+                int(min(128, max(10, np.max(np.abs(s_vals - self.center_s)) * 1.5 + 10))),
+                int(min(128, max(10, np.max(np.abs(v_vals - self.center_v)) * 1.5 + 10))))
+
     def _recalculate_hsv_center(self):
-        """根据所有颜色点重新计算 HSV 中心和容差。"""
-        # 合并原始颜色点和新添加的颜色点
-        all_colors = list(self.color_points) + self._added_colors
-        n_pts = len(all_colors)
+        """根据所有颜色点重新计算 HSV 中心和容差 (中心直接由累加器得出)。"""
+        n_pts = len(self._color_buf)
 
         if n_pts == 0:
             return
 
-        # 计算每个颜色点的 HSV
-        pts_arr = np.array(all_colors, dtype=np.uint8).reshape(1, n_pts, 3)
-        pts_hsv = _rgb_to_hsv_array(pts_arr)[0]  # (n_pts, 3)
-        h_vals = pts_hsv[:, 0]
-        s_vals = pts_hsv[:, 1]
-        v_vals = pts_hsv[:, 2]
-
-        # H 通道的环形平均
-        h_rad = h_vals * (np.pi / 90.0)  # 0-180 → 0-2π
-        mean_sin = np.mean(np.sin(h_rad))
-        mean_cos = np.mean(np.cos(h_rad))
-        self.center_h = float(np.arctan2(mean_sin, mean_cos) * (90.0 / np.pi)) % 180.0
-        self.center_s = float(np.mean(s_vals))
-        self.center_v = float(np.mean(v_vals))
-
-        # 更新平均 RGB (用于显示色块)
-        avg_r = int(round(sum(p[0] for p in all_colors) / n_pts))
-        avg_g = int(round(sum(p[1] for p in all_colors) / n_pts))
-        avg_b = int(round(sum(p[2] for p in all_colors) / n_pts))
-        self.center_rgb = (avg_r, avg_g, avg_b)
+        self._update_center()
 
         # 更新主色块
         color_hex = "#%02x%02x%02x" % self.center_rgb
@@ -1432,11 +1977,7 @@ class ColorAnalysisWindow(tk.Toplevel):
 
         # 如果启用了自动调整容差，则根据颜色点散布更新容差
         if self._auto_tol_var.get() and n_pts > 1:
-            h_diffs = np.abs(h_vals - self.center_h)
-            h_diffs = np.minimum(h_diffs, 180.0 - h_diffs)
-            new_h = int(min(90, max(5, np.max(h_diffs) * 1.5 + 5)))
-            new_s = int(min(128, max(10, np.max(np.abs(s_vals - self.center_s)) * 1.5 + 10)))
-            new_v = int(min(128, max(10, np.max(np.abs(v_vals - self.center_v)) * 1.5 + 10)))
+            new_h, new_s, new_v = self._spread_tol()
             self.h_tol.set(new_h)
             self.s_tol.set(new_s)
             self.v_tol.set(new_v)
@@ -1448,7 +1989,7 @@ class ColorAnalysisWindow(tk.Toplevel):
             widget.destroy()
 
         # 显示所有颜色点（原始 + 新添加）
-        all_colors = list(self.color_points) + self._added_colors
+        all_colors = self._color_buf.tolist()
         if len(all_colors) <= 1:
             return
 
@@ -1482,21 +2023,15 @@ class ColorAnalysisWindow(tk.Toplevel):
     def _pv_on_left_drag(self, event):
         # 框选删除拖拽
         if self._delete_mode and self._delete_drag_start is not None:
-            self.preview_canvas.delete("delete_rect")
             x0, y0 = self._delete_drag_start
-            self.preview_canvas.create_rectangle(
-                x0, y0, event.x, event.y,
-                outline="#FF0000", width=2, dash=(4, 4), tags="delete_rect",
-            )
+            _drag_rect(self.preview_canvas, "delete_rect", x0, y0, event.x, event.y,
+                       outline="#FF0000", width=2, dash=(4, 4))
             return
         # 分组框选拖拽
         if self._group_mode and self._group_drag_start is not None:
-            self.preview_canvas.delete("group_rect")
             x0, y0 = self._group_drag_start
-            self.preview_canvas.create_rectangle(
-                x0, y0, event.x, event.y,
-                outline="#00FF00", width=2, dash=(4, 4), tags="group_rect",
-            )
+            _drag_rect(self.preview_canvas, "group_rect", x0, y0, event.x, event.y,
+                       outline="#00FF00", width=2, dash=(4, 4))
             return
         if not self._split_drawing:
             return
@@ -1601,50 +2136,45 @@ class ColorAnalysisWindow(tk.Toplevel):
             img_pts.append((tx * t2i_x, ty * t2i_y))
 
         radius = max(1.0, self._brush_width.get() / 2.0)
-        stroke = np.zeros((self.img_h_total, self.img_w_total), dtype=bool)
-        for k in range(len(img_pts) - 1):
-            self._draw_line_on_mask(stroke, *img_pts[k], *img_pts[k + 1], radius)
+        stroke = [_segment_spans(*img_pts[k], *img_pts[k + 1], radius,
+                                 self.img_h_total, self.img_w_total)
+                  for k in range(len(img_pts) - 1)]
 
         self._cut_strokes.append(stroke)
-        self._cut_mask |= stroke
+        self._update_cut_spans(stroke, add=True)
         self._update_preview()
 
-    @staticmethod
-    def _draw_line_on_mask(mask, x0, y0, x1, y1, radius):
-        """在布尔蒙版上画一条宽为 2*radius 的线段 (向量化)。"""
-        h, w = mask.shape
-        bx0 = max(0, int(min(x0, x1) - radius) - 1)
-        by0 = max(0, int(min(y0, y1) - radius) - 1)
-        bx1 = min(w, int(max(x0, x1) + radius) + 2)
-        by1 = min(h, int(max(y0, y1) + radius) + 2)
-        if bx0 >= bx1 or by0 >= by1:
-            return
-        yy, xx = np.mgrid[by0:by1, bx0:bx1]
-        dx, dy = x1 - x0, y1 - y0
-        seg_len_sq = dx * dx + dy * dy
-        if seg_len_sq < 1e-6:
-            dist_sq = (xx - x0) ** 2 + (yy - y0) ** 2
-        else:
-            t = np.clip(((xx - x0) * dx + (yy - y0) * dy) / seg_len_sq, 0.0, 1.0)
-            px = x0 + t * dx
-            py = y0 + t * dy
-            dist_sq = (xx - px) ** 2 + (yy - py) ** 2
-        mask[by0:by1, bx0:bx1] |= (dist_sq <= radius * radius)
+    def _update_cut_spans(self, stroke, add):
+        """笔画覆盖的像素计数加 1 (add=True) 或减 1，并只在这些像素上刷新 _cut_mask。
+
+        修改前先等后台任务结束，避免其读到改了一半的蒙版；全部改完后才更新版本号。
+        """
+        self._wait_compute()
+        refcount = self._cut_refcount
+        for ys, x_lo, x_hi in stroke:
+            for y, a, b in zip(ys.tolist(), x_lo.tolist(), (x_hi + 1).tolist()):
+                row = refcount[y, a:b]
+                if add:
+                    row += 1
+                else:
+                    row -= 1
+                self._cut_mask[y, a:b] = row > 0
+        self._exclude_version += 1
 
     def _undo_split(self):
         if not self._cut_strokes:
             return
-        self._cut_strokes.pop()
-        self._cut_mask = np.zeros((self.img_h_total, self.img_w_total), dtype=bool)
-        for s in self._cut_strokes:
-            self._cut_mask |= s
+        self._update_cut_spans(self._cut_strokes.pop(), add=False)
         self._update_preview()
 
     def _clear_splits(self):
         if not self._cut_strokes:
             return
         self._cut_strokes.clear()
+        self._wait_compute()
+        self._cut_refcount[:] = 0
         self._cut_mask[:] = False
+        self._exclude_version += 1
         self._update_preview()
 
     # --------------------------------------------------------- 预览缩放/平移
@@ -1693,6 +2223,16 @@ class ColorAnalysisWindow(tk.Toplevel):
         self._render_preview()
 
     # --------------------------------------------------------- 预览渲染
+    def _on_preview_configure(self, _event):
+        """拖动改变窗口大小时合并连续的 <Configure> 事件，停下 30 ms 后才重绘。"""
+        if self._resize_after is not None:
+            self.after_cancel(self._resize_after)
+        self._resize_after = self.after(30, self._render_preview_after_resize)
+
+    def _render_preview_after_resize(self):
+        self._resize_after = None
+        self._render_preview()
+
     def _render_preview(self):
         """将缓存的遮罩预览图按缩放/平移状态渲染到画布，叠加颗粒编号。"""
         if self._overlay_pil is None:
@@ -1721,13 +2261,22 @@ class ColorAnalysisWindow(tk.Toplevel):
         if t_x1 <= t_x0 or t_y1 <= t_y0:
             return
 
-        crop = self._overlay_pil.crop((t_x0, t_y0, t_x1, t_y1))
         crop_w = max(1, int((t_x1 - t_x0) * actual_scale))
         crop_h = max(1, int((t_y1 - t_y0) * actual_scale))
-
         resample = Image.NEAREST if self._pv_zoom > 3 else Image.BILINEAR
-        resized = crop.resize((crop_w, crop_h), resample)
-        self._preview_tk = ImageTk.PhotoImage(resized)
+
+        # 可见范围、输出尺寸和遮罩图都没变时 (如整图可见时平移、窗口重绘) 复用上次的 PhotoImage
+        render_key = (t_x0, t_y0, t_x1, t_y1, crop_w, crop_h, resample, self._overlay_version)
+        if render_key != self._render_key:
+            # resize 的 box 参数直接从可见范围重采样，省去先 crop 出的中间图
+            resized = self._overlay_pil.resize((crop_w, crop_h), resample,
+                                               box=(t_x0, t_y0, t_x1, t_y1))
+            if (self._preview_tk is not None and self._preview_tk.width() == crop_w
+                    and self._preview_tk.height() == crop_h):
+                self._preview_tk.paste(resized)  # 尺寸不变时复用现有的 Tk 图像
+            else:
+                self._preview_tk = ImageTk.PhotoImage(resized)
+            self._render_key = render_key
 
         px = img_cx + t_x0 * actual_scale
         py = img_cy + t_y0 * actual_scale
@@ -1749,8 +2298,7 @@ class ColorAnalysisWindow(tk.Toplevel):
                 )
 
         # 绘制分组矩形
-        group_colors = ["#00FF00", "#FF6600", "#00CCFF", "#FF00FF",
-                        "#FFFF00", "#00FF80", "#8080FF", "#FF8080"]
+        group_colors = self._GROUP_COLORS
         for gi, (gname, gx1, gy1, gx2, gy2) in enumerate(self._ca_groups):
             cx1, cy1 = self._full_to_canvas(gx1, gy1)
             cx2, cy2 = self._full_to_canvas(gx2, gy2)
@@ -1766,22 +2314,21 @@ class ColorAnalysisWindow(tk.Toplevel):
 
     # --------------------------------------------------------- 面积直方图
     def _show_area_histogram(self):
-        if not self.particle_areas:
+        self._refine()
+        if len(self.particle_areas) == 0:
             messagebox.showwarning(self._t("warn"), self._t("no_data"))
             return
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from matplotlib.figure import Figure
 
         has_scale = self.app.scale > 0
         area_factor = self._area_display_factor()
         unit = self._area_unit_str()
 
-        if has_scale:
-            vals = np.array(self.particle_areas, dtype=float) * area_factor
-        else:
-            vals = np.array(self.particle_areas, dtype=float)
+        # 面积数组直接参与换算与统计，不再经由列表重建
+        vals = self.particle_areas * (area_factor if has_scale else 1.0)
 
-        n = len(vals)
-        mean = np.mean(vals)
-        std = np.std(vals, ddof=1) if n > 1 else 0.0
+        n, mean, std, v_min, v_max = _describe(vals)
 
         win = tk.Toplevel(self)
         win.title(self._t("ca_hist_title"))
@@ -1790,14 +2337,15 @@ class ColorAnalysisWindow(tk.Toplevel):
         fig = Figure(figsize=(7, 5), dpi=100)
         ax = fig.add_subplot(111)
 
-        num_bins = max(5, int(math.sqrt(n)))
-        ax.hist(vals, bins=num_bins, density=True, alpha=0.7,
+        num_bins = _hist_bins(n)
+        # 传入已求出的数据范围，np.histogram 按等宽箱直接算箱号，不再重复求 min/max
+        ax.hist(vals, bins=num_bins, range=(v_min, v_max), density=True, alpha=0.7,
                 color="#4C72B0", edgecolor="white",
                 label=self._t("ca_hist_legend_hist"))
 
         if std > 0:
-            x_fit = np.linspace(vals.min() - std, vals.max() + std, 200)
-            y_fit = norm.pdf(x_fit, mean, std)
+            x_fit = np.linspace(v_min - std, v_max + std, _FIT_N)
+            y_fit = _gaussian_pdf(x_fit, mean, std)
             ax.plot(x_fit, y_fit, "r-", linewidth=2,
                     label=self._t("ca_hist_legend_fit"))
 
@@ -1818,7 +2366,8 @@ class ColorAnalysisWindow(tk.Toplevel):
 
     # --------------------------------------------------------- CSV 导出
     def _export_area_csv(self):
-        if not self.particle_areas:
+        self._refine()
+        if len(self.particle_areas) == 0:
             messagebox.showwarning(self._t("warn"), self._t("no_data"))
             return
 
@@ -1834,39 +2383,44 @@ class ColorAnalysisWindow(tk.Toplevel):
         area_factor = self._area_display_factor()
         unit = self._area_unit_str()
         has_groups = bool(self._ca_groups)
+        areas = self.particle_areas
+        vals_arr = areas * (area_factor if has_scale else 1.0)
+        if has_groups:
+            # 分组标签不足颗粒数时补空串
+            labels = self._ca_group_labels[:len(areas)]
+            labels += [""] * (len(areas) - len(labels))
 
         try:
-            with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            with open(path, "w", newline="", encoding="utf-8-sig",
+                      buffering=1 << 20) as f:
                 writer = csv.writer(f)
                 header = ["#", self._t("ca_col_area", u=unit),
                           self._t("ca_col_area", u="px\u00b2")]
                 if has_groups:
                     header.append(self._t("ca_col_group"))
                 writer.writerow(header)
-                for i, a_px in enumerate(self.particle_areas, 1):
-                    a_val = a_px * area_factor if has_scale else a_px
-                    row = [i, f"{a_val:.4f}", a_px]
-                    if has_groups:
-                        grp = self._ca_group_labels[i - 1] if i - 1 < len(self._ca_group_labels) else ""
-                        row.append(grp)
-                    writer.writerow(row)
+                # 数据行：先按列整体生成 (序号 / 换算面积 / 像素面积 / 分组)，
+                # 再 zip 成行交给 writerows 一次写完，逐行不再有分支和元组拼接
+                cols = [range(1, len(areas) + 1),
+                        [f"{a_val:.4f}" for a_val in vals_arr.tolist()],
+                        areas.tolist()]
+                if has_groups:
+                    cols.append(labels)
+                writer.writerows(zip(*cols))
 
                 writer.writerow([])
                 writer.writerow([self._t("csv_stat"), self._t("csv_value")])
 
-                vals = [a * area_factor for a in self.particle_areas] if has_scale else [float(a) for a in self.particle_areas]
-                n = len(vals)
-                mean = np.mean(vals)
-                std_val = np.std(vals, ddof=1) if n > 1 else 0.0
+                n, mean, std_val, v_min, v_max = _describe(vals_arr)
                 total_pixels = self.img_h_total * self.img_w_total
-                total_px = sum(self.particle_areas)
+                total_px = int(areas.sum())
                 coverage = total_px / total_pixels * 100.0 if total_pixels > 0 else 0.0
 
                 writer.writerow([self._t("ca_particle_count", n=""), n])
                 writer.writerow([self._t("csv_mean"), f"{mean:.4f}"])
                 writer.writerow([self._t("csv_std"), f"{std_val:.4f}"])
-                writer.writerow([self._t("csv_min"), f"{min(vals):.4f}"])
-                writer.writerow([self._t("csv_max"), f"{max(vals):.4f}"])
+                writer.writerow([self._t("csv_min"), f"{v_min:.4f}"])
+                writer.writerow([self._t("csv_max"), f"{v_max:.4f}"])
                 writer.writerow([self._t("ca_coverage", c=0.0).split(":")[0], f"{coverage:.2f}%"])
                 if has_scale:
                     scale_unit = f"{self.app.unit}/px"
@@ -1875,23 +2429,22 @@ class ColorAnalysisWindow(tk.Toplevel):
 
                 # ---- 分组统计 ----
                 if has_groups:
-                    group_data: dict[str, list[float]] = {}
-                    for i, a_px in enumerate(self.particle_areas):
-                        grp = self._ca_group_labels[i] if i < len(self._ca_group_labels) else ""
-                        if grp:
-                            a_val = a_px * area_factor if has_scale else float(a_px)
-                            group_data.setdefault(grp, []).append(a_val)
-                    for gname, gvals in group_data.items():
+                    # 标签一次性映射为整数分组号 (按首次出现的顺序)，各分组直接在数组上取子集
+                    name_idx = {}
+                    for lbl in labels:
+                        if lbl:
+                            name_idx.setdefault(lbl, len(name_idx))
+                    gid = np.fromiter((name_idx.get(lbl, -1) for lbl in labels),
+                                      np.intp, count=len(labels))
+                    for gname, k in name_idx.items():
                         writer.writerow([])
                         writer.writerow([self._t("csv_group_stat", name=gname)])
-                        gn = len(gvals)
-                        gmean = np.mean(gvals)
-                        gstd = np.std(gvals, ddof=1) if gn > 1 else 0.0
+                        gn, gmean, gstd, gmin, gmax = _describe(vals_arr[gid == k])
                         writer.writerow([self._t("ca_particle_count", n=""), gn])
                         writer.writerow([self._t("csv_mean"), f"{gmean:.4f}"])
                         writer.writerow([self._t("csv_std"), f"{gstd:.4f}"])
-                        writer.writerow([self._t("csv_min"), f"{min(gvals):.4f}"])
-                        writer.writerow([self._t("csv_max"), f"{max(gvals):.4f}"])
+                        writer.writerow([self._t("csv_min"), f"{gmin:.4f}"])
+                        writer.writerow([self._t("csv_max"), f"{gmax:.4f}"])
 
                 # ---- 高斯拟合 ----
                 if n > 1 and std_val > 0:
@@ -1903,15 +2456,12 @@ class ColorAnalysisWindow(tk.Toplevel):
                     writer.writerow([self._t("csv_gauss_sigma"), f"{std_val:.4f}"])
 
                     writer.writerow([])
-                    vals_arr = np.array(vals)
-                    x_fit = np.linspace(vals_arr.min() - std_val,
-                                        vals_arr.max() + std_val, 200)
-                    y_fit = norm.pdf(x_fit, mean, std_val)
+                    x_fit = _fit_linspace(v_min - std_val, v_max + std_val)
+                    y_fit = _gaussian_pdf(x_fit, mean, std_val, out=_FIT_Y)
                     writer.writerow([self._t("csv_gauss_curve")])
                     writer.writerow([self._t("csv_gauss_x", u=unit),
                                      self._t("csv_gauss_y")])
-                    for xv, yv in zip(x_fit, y_fit):
-                        writer.writerow([f"{xv:.4f}", f"{yv:.6f}"])
+                    writer.writerows(_fit_curve_rows(x_fit, y_fit))
 
             self.app.status_var.set(self._t("ca_exported_fmt", p=path))
         except Exception as exc:
@@ -1923,6 +2473,14 @@ class ColorAnalysisWindow(tk.Toplevel):
 # ---------------------------------------------------------------------------
 
 class NanoMeasurer(tk.Tk):
+    _PYRAMID_MIN = 256  # 图像金字塔最小一层的短边 (像素)
+    # 各模式在状态栏显示的文字键 (鼠标移动时只查当前模式这一项)
+    _MODE_KEYS = {"idle": "mode_idle", "set_scale": "mode_scale", "measure": "mode_measure",
+                  "pick_color": "mode_pick_color", "group_select": "mode_group"}
+    # 主画布上分组矩形的颜色，按分组序号循环取用
+    _GROUP_COLORS = ("#00FF00", "#00CCFF", "#FF9900", "#FF00FF",
+                     "#FFFF00", "#00FFCC", "#FF6666", "#9966FF")
+
     def __init__(self):
         super().__init__()
         self.title("Measurement Tool")
@@ -1931,9 +2489,12 @@ class NanoMeasurer(tk.Tk):
 
         # ---- 语言 ----
         self.lang = "zh"
+        self._strings = _LANG_TABLES[self.lang]  # 当前语言的查找表，切换语言时替换
 
         # ---- 状态变量 ----
         self.pil_image = None
+        self._img_np = None  # pil_image 的 (H, W, 3) uint8 数组视图，取色时直接切片
+        self._pyramid: list[Image.Image] = []  # [原图, 1/2, 1/4, …]，缩小显示时取用
         self.tk_image = None
         self.img_w = 0
         self.img_h = 0
@@ -1945,36 +2506,54 @@ class NanoMeasurer(tk.Tk):
         self.scale = 0.0
         self.unit = "nm"  # 校准单位
         self.display_unit = "nm"  # 显示单位
+        self._disp_factor = 1.0  # 校准单位 → 显示单位的换算系数，单位变化时由 _update_disp_factor 更新
         self.units = SUPPORTED_UNITS
         self.mode = "idle"
         self.click_pt = None
 
         self.measurements: list[Measurement] = []
         self.undo_stack: list[Measurement] = []
+        # 与 measurements 一一对应的 SoA 缓冲，每行为 X1, Y1, X2, Y2, 像素距离, 校准距离；
+        # 增删测量时原地更新 (容量不足时翻倍)，列表统计/直方图直接在视图上整体计算
+        self._meas_buf = np.empty((64, 6), dtype=np.float64)
+        self._set_meas_count(0)
+        self._labels = []  # 各测量在画布上的标注文字，随 _refresh_list 一次性生成
         self.groups: list[MeasurementGroup] = []
 
         self._pan_start = None
         self._right_press_pos = None
+        # 橡皮筋线与距离文字只创建一次，之后移动鼠标只更新坐标/文字，取消时隐藏
         self._rubber_line = None
         self._rubber_text = None
+        self._rubber_shown = False
 
         self._group_drag_start = None  # (ix, iy) for group rectangle drag
 
         self._pick_color_points: list[tuple] = []   # [(img_x, img_y, r, g, b), ...]
         self._pick_color_total: int = 1
 
+        self._resize_after: str | None = None  # <Configure> 防抖定时器 id
+        self._motion_after: str | None = None  # <Motion> 节流定时器 id
+        self._motion_xy = (0, 0)               # 最近一次 <Motion> 的画布坐标
+
+        # 画布 item 复用：背景图与各标注的 item id 跨次渲染保留，平移/缩放时只更新坐标
+        self._bg_item = None
+        self._meas_items: list[tuple] = []   # 每个测量的 (线, 端点, 端点, 标签)
+        self._group_items: list[tuple] = []  # 每个分组的 (矩形, 名称)
+        self._pick_items: list[tuple] = []   # 每个取色标记的 (圆点, 序号)
+        self._hidden_items: set[tuple] = set()  # 当前因不在可见范围内而隐藏的 item 组
+
+        self._panel_built = False  # 右侧面板推迟到首帧之后构建，见 _ensure_right_panel
+
         self._build_ui()
         self._bind_shortcuts()
 
     # -- 国际化 helper --
     def _t(self, key, **kwargs):
         """查找当前语言的字符串，支持 .format() 参数。"""
-        entry = STRINGS.get(key)
-        if entry is None:
-            return key
-        raw = entry.get(self.lang, entry.get("zh", key))
+        raw = self._strings.get(key, key)
         if kwargs:
-            return raw.format(**kwargs)
+            return raw.format_map(kwargs)
         return raw
 
     # ------------------------------------------------------------------ UI
@@ -2062,9 +2641,11 @@ class NanoMeasurer(tk.Tk):
         self.canvas.pack(fill=tk.BOTH, expand=True)
         body.add(canvas_frame, weight=3)
 
+        # 右侧面板 (Treeview / Combobox 等) 只先放一个空 Frame 占位，
+        # 控件在空闲回调里再构建，窗口可以先完成首次绘制
         self.right_panel = ttk.Frame(body, width=280)
-        self._build_right_panel(self.right_panel)
         body.add(self.right_panel, weight=0)
+        self.after_idle(self._ensure_right_panel)
 
         # -- 状态栏 --
         self.status_var = tk.StringVar(value=self._t("ready"))
@@ -2083,7 +2664,13 @@ class NanoMeasurer(tk.Tk):
         self.canvas.bind("<Button-4>", self._on_scroll_linux_up)
         self.canvas.bind("<Button-5>", self._on_scroll_linux_down)
         self.canvas.bind("<Motion>", self._on_motion)
-        self.canvas.bind("<Configure>", lambda e: self._render())
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
+
+    def _ensure_right_panel(self):
+        """构建右侧面板 (只执行一次)。访问面板控件的方法先调用这里，空闲回调之前也能安全使用。"""
+        if not self._panel_built:
+            self._panel_built = True
+            self._build_right_panel(self.right_panel)
 
     def _build_right_panel(self, parent):
         self.lf_scale = ttk.LabelFrame(parent, text=self._t("scale_info"), padding=6)
@@ -2155,10 +2742,12 @@ class NanoMeasurer(tk.Tk):
 
     def _toggle_lang(self):
         self.lang = "en" if self.lang == "zh" else "zh"
+        self._strings = _LANG_TABLES[self.lang]
         self._refresh_ui_text()
 
     def _refresh_ui_text(self):
         """切换语言后刷新所有 UI 文本。"""
+        self._ensure_right_panel()
         self.btn_lang.config(text="EN" if self.lang == "zh" else "中文")
 
         self.btn_open.config(text=self._t("open_image"))
@@ -2203,17 +2792,14 @@ class NanoMeasurer(tk.Tk):
         self.btn_clear.config(text=self._t("clear_all"))
 
         self.lf_stat.config(text=self._t("statistics"))
-        self._refresh_list()  # 刷新统计文本
+        self._update_stats()  # 刷新统计文本 (列表数值与语言无关，不必整表重建)
 
         mode_text = self._mode_text()
         self.status_var.set(self._t("status_short_fmt", mode=mode_text, zoom=self.zoom * 100))
 
     def _mode_text(self):
-        return {"idle": self._t("mode_idle"),
-                "set_scale": self._t("mode_scale"),
-                "measure": self._t("mode_measure"),
-                "pick_color": self._t("mode_pick_color"),
-                "group_select": self._t("mode_group")}.get(self.mode, "")
+        key = self._MODE_KEYS.get(self.mode)
+        return self._strings.get(key, key) if key else ""
 
     # --------------------------------------------------------- 快捷键
     def _bind_shortcuts(self):
@@ -2246,25 +2832,35 @@ class NanoMeasurer(tk.Tk):
 
         # 16-bit TIFF → 8-bit
         if img.mode in ("I;16", "I;16B", "I;16L", "I"):
-            arr = np.array(img, dtype=np.float64)
-            lo, hi = arr.min(), arr.max()
+            arr = np.asarray(img)
+            lo, hi = int(arr.min()), int(arr.max())
             if hi > lo:
-                arr = (arr - lo) / (hi - lo) * 255.0
+                # 整数运算 (x - lo) * 255 // (hi - lo) 是精确的向下取整；浮点公式 (x - lo) / (hi - lo) * 255
+                # 截断时可能因舍入误差少 1，两者相差至多 1 LSB。16-bit 用 uint32 (32-bit 用 int64) 不会溢出，
+                # 不再经过 float64 临时数组
+                d = np.subtract(arr, lo, dtype=np.uint32 if arr.dtype.itemsize <= 2 else np.int64)
+                d *= 255
+                d //= hi - lo
+                arr = d
             img = Image.fromarray(arr.astype(np.uint8))
 
         if img.mode != "RGB":
             img = img.convert("RGB")
 
         self.pil_image = img
+        self._img_np = np.asarray(img)
         self.img_w, self.img_h = img.size
+        self._build_pyramid()
         self.title(f"Measurement Tool - {os.path.basename(path)}")
 
-        self.measurements.clear()
+        self._clear_measurements()
         self.undo_stack.clear()
         self.groups.clear()
         self.scale = 0.0
         self.unit = "nm"
         self.display_unit = "nm"
+        self._update_disp_factor()
+        self._ensure_right_panel()
         self.display_unit_var.set("nm")
         self.click_pt = None
         self.mode = "idle"
@@ -2272,6 +2868,23 @@ class NanoMeasurer(tk.Tk):
         self._refresh_list()
         self.fit_to_window()
 
+    def _build_pyramid(self):
+        """加载图片时一次性生成逐级 1/2 的图像金字塔 (box 滤波)，缩小显示时直接取用。"""
+        level = self.pil_image
+        self._pyramid = [level]
+        while min(level.size) // 2 >= self._PYRAMID_MIN:
+            level = level.reduce(2)
+            self._pyramid.append(level)
+
+    def _pyramid_source(self, out_w, out_h):
+        """返回金字塔中宽高都不小于 (out_w, out_h) 的最小一层，缩小重采样时从这一层取。"""
+        src = self._pyramid[0]
+        for level in self._pyramid[1:]:
+            if level.width < out_w or level.height < out_h:
+                break
+            src = level
+        return src
+
     # --------------------------------------------------------- 缩放/平移
     def fit_to_window(self):
         if self.pil_image is None:
@@ -2338,14 +2951,20 @@ class NanoMeasurer(tk.Tk):
                 and abs(event.y - self._right_press_pos[1]) < 5):
             if self.mode == "measure" and self.click_pt is not None:
                 self.click_pt = None
-                self.canvas.delete("rubber")
+                self._hide_rubber()
                 self.status_var.set(self._t("meas_cancelled"))
         self._right_press_pos = None
 
     # --------------------------------------------------------- 坐标转换
-    def _canvas_to_img(self, cx, cy):
+    def _canvas_to_img(self, cx, cy, clamp=False):
+        """画布坐标 → 原图坐标；clamp=True 时限制在图像范围 [0, w-1] × [0, h-1] 内。"""
         ix = (cx - self.offset_x) / self.zoom
         iy = (cy - self.offset_y) / self.zoom
+        if clamp:
+            x_max = self.img_w - 1
+            y_max = self.img_h - 1
+            ix = 0 if ix < 0 else (x_max if ix > x_max else ix)
+            iy = 0 if iy < 0 else (y_max if iy > y_max else iy)
         return ix, iy
 
     def _img_to_canvas(self, ix, iy):
@@ -2354,9 +2973,32 @@ class NanoMeasurer(tk.Tk):
         return cx, cy
 
     # --------------------------------------------------------- 渲染
-    def _render(self):
+    def _on_canvas_configure(self, _event):
+        """拖动改变窗口大小时合并连续的 <Configure> 事件，停下 30 ms 后才重绘。"""
+        if self._resize_after is not None:
+            self.after_cancel(self._resize_after)
+        self._resize_after = self.after(30, self._render_after_resize)
+
+    def _render_after_resize(self):
+        self._resize_after = None
+        self._render()
+
+    def _clear_canvas(self):
         self.canvas.delete("all")
+        self._bg_item = None
+        self._rubber_line = self._rubber_text = None
+        self._rubber_shown = False
+        self._meas_items.clear()
+        self._group_items.clear()
+        self._pick_items.clear()
+        self._hidden_items.clear()
+
+    def _render(self):
+        # 橡皮筋线/框选框随视图变化作废；背景图与标注 item 保留，下面只更新坐标和内容
+        self._hide_rubber()
+        self.canvas.delete("group_rect")
         if self.pil_image is None:
+            self._clear_canvas()
             return
 
         cw = self.canvas.winfo_width()
@@ -2371,12 +3013,24 @@ class NanoMeasurer(tk.Tk):
         iy1c = min(self.img_h, int(math.ceil(iy1)))
 
         if ix1c <= ix0c or iy1c <= iy0c:
+            self._clear_canvas()
             self._update_status_idle()
             return
 
-        crop = self.pil_image.crop((ix0c, iy0c, ix1c, iy1c))
-        new_w = max(1, int((ix1c - ix0c) * self.zoom))
-        new_h = max(1, int((iy1c - iy0c) * self.zoom))
+        # 缩小显示时从金字塔中选不小于显示尺寸的最近一层裁剪，不再每次从原图重采样
+        level = 0
+        if self.zoom < 1.0:
+            level = min(len(self._pyramid) - 1, int(-math.log2(self.zoom)))
+        src = self._pyramid[level]
+        fx = self.img_w / src.width
+        fy = self.img_h / src.height
+        lx0 = int(ix0c / fx)
+        ly0 = int(iy0c / fy)
+        lx1 = min(src.width, int(math.ceil(ix1c / fx)))
+        ly1 = min(src.height, int(math.ceil(iy1c / fy)))
+
+        new_w = max(1, int((lx1 - lx0) * fx * self.zoom))
+        new_h = max(1, int((ly1 - ly0) * fy * self.zoom))
 
         max_dim = 4000
         if new_w > max_dim or new_h > max_dim:
@@ -2385,66 +3039,135 @@ class NanoMeasurer(tk.Tk):
             new_h = max(1, int(new_h * ratio))
 
         resample = Image.NEAREST if self.zoom > 4 else Image.BILINEAR
-        crop_resized = crop.resize((new_w, new_h), resample)
-        self.tk_image = ImageTk.PhotoImage(crop_resized)
+        # resize 的 box 参数直接从可见范围重采样，省去先 crop 出的中间图
+        crop_resized = src.resize((new_w, new_h), resample, box=(lx0, ly0, lx1, ly1))
+        # 尺寸不变时 (平移、同一缩放级别) 把新像素贴进现有的 PhotoImage，不重新分配 Tk 图像
+        if (self.tk_image is not None and self.tk_image.width() == new_w
+                and self.tk_image.height() == new_h):
+            self.tk_image.paste(crop_resized)
+        else:
+            self.tk_image = ImageTk.PhotoImage(crop_resized)
 
-        px, py = self._img_to_canvas(ix0c, iy0c)
-        self.canvas.create_image(px, py, anchor=tk.NW, image=self.tk_image)
+        px, py = self._img_to_canvas(lx0 * fx, ly0 * fy)
+        if self._bg_item is None:
+            self._bg_item = self.canvas.create_image(px, py, anchor=tk.NW, image=self.tk_image)
+            self.canvas.tag_lower(self._bg_item)
+        else:
+            self.canvas.coords(self._bg_item, px, py)
+            self.canvas.itemconfig(self._bg_item, image=self.tk_image)
 
         self._draw_overlays()
         self._update_status_idle()
 
+    def _sync_items(self, items, n, create):
+        """将 item 池调整为 n 组：不足时用 create() 补建，多余的整组删除。返回是否新建了 item。"""
+        grew = len(items) < n
+        while len(items) < n:
+            items.append(create())
+        for ids in items[n:]:
+            self.canvas.delete(*ids)
+            self._hidden_items.discard(ids)
+        del items[n:]
+        return grew
+
+    def _set_items_visible(self, ids, visible):
+        """显示/隐藏一组 item；状态未变时不调用 Tk。"""
+        if visible == (ids in self._hidden_items):
+            state = tk.NORMAL if visible else tk.HIDDEN
+            for i in ids:
+                self.canvas.itemconfig(i, state=state)
+            if visible:
+                self._hidden_items.discard(ids)
+            else:
+                self._hidden_items.add(ids)
+
+    def _create_meas_items(self):
+        c = self.canvas
+        return (c.create_line(0, 0, 0, 0, fill="#FF3333", width=2, tags="overlay"),
+                c.create_oval(0, 0, 0, 0, fill="#FF3333", outline="", tags="overlay"),
+                c.create_oval(0, 0, 0, 0, fill="#FF3333", outline="", tags="overlay"),
+                c.create_text(0, 0, fill="#FFFF00", font=("Arial", 9, "bold"), tags="overlay"))
+
+    def _create_group_items(self):
+        c = self.canvas
+        return (c.create_rectangle(0, 0, 0, 0, width=2, dash=(6, 3),
+                                   tags=("overlay", "overlay_group")),
+                c.create_text(0, 0, anchor=tk.NW, font=("Arial", 10, "bold"),
+                              tags=("overlay", "overlay_group")))
+
+    def _create_pick_items(self):
+        c = self.canvas
+        return (c.create_oval(0, 0, 0, 0, outline="white", width=2,
+                              tags=("overlay", "overlay_pick")),
+                c.create_text(0, 0, fill="#00FF00", font=("Arial", 9, "bold"),
+                              tags=("overlay", "overlay_pick")))
+
     def _draw_overlays(self):
-        for i, m in enumerate(self.measurements):
+        canvas = self.canvas
+        # 包围盒完全在画布外 (留出标签文字的余量) 的标注只隐藏，不更新坐标和文字
+        pad = 50
+        x_lo, y_lo = -pad, -pad
+        x_hi = canvas.winfo_width() + pad
+        y_hi = canvas.winfo_height() + pad
+        # 测量线条新增的 item 在最上层，需把分组框和取色标记重新提到其上方
+        if self._sync_items(self._meas_items, len(self.measurements), self._create_meas_items):
+            canvas.tag_raise("overlay_group")
+            canvas.tag_raise("overlay_pick")
+        r = 3
+        for (line, dot1, dot2, text), m, label in zip(self._meas_items, self.measurements,
+                                                      self._labels):
             cx1, cy1 = self._img_to_canvas(m.x1, m.y1)
             cx2, cy2 = self._img_to_canvas(m.x2, m.y2)
-            self.canvas.create_line(cx1, cy1, cx2, cy2, fill="#FF3333", width=2, tags="overlay")
-            r = 3
-            for cx, cy in [(cx1, cy1), (cx2, cy2)]:
-                self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r,
-                                        fill="#FF3333", outline="", tags="overlay")
+            visible = (max(cx1, cx2) >= x_lo and min(cx1, cx2) <= x_hi
+                       and max(cy1, cy2) >= y_lo and min(cy1, cy2) <= y_hi)
+            self._set_items_visible((line, dot1, dot2, text), visible)
+            if not visible:
+                continue
+            canvas.coords(line, cx1, cy1, cx2, cy2)
+            canvas.coords(dot1, cx1 - r, cy1 - r, cx1 + r, cy1 + r)
+            canvas.coords(dot2, cx2 - r, cy2 - r, cx2 + r, cy2 + r)
             mx, my = (cx1 + cx2) / 2, (cy1 + cy2) / 2
-            if self.scale > 0:
-                dv = self._display_value(m.nm_dist)
-                label = f"{dv:.2f} {self.display_unit}"
-            else:
-                label = f"{m.pixel_dist:.1f} px"
-            self.canvas.create_text(mx, my - 10, text=label,
-                                    fill="#FFFF00", font=("Arial", 9, "bold"), tags="overlay")
-
-        # 分组矩形
-        group_colors = ["#00FF00", "#00CCFF", "#FF9900", "#FF00FF",
-                        "#FFFF00", "#00FFCC", "#FF6666", "#9966FF"]
-        for gi, g in enumerate(self.groups):
+            canvas.coords(text, mx, my - 10)
+            canvas.itemconfig(text, text=label)
+
+        # 分组矩形 (删除中间的分组后序号会前移，颜色每次按序号重新设置)
+        group_colors = self._GROUP_COLORS
+        if self._sync_items(self._group_items, len(self.groups), self._create_group_items):
+            canvas.tag_raise("overlay_pick")
+        for gi, ((rect, text), g) in enumerate(zip(self._group_items, self.groups)):
             color = group_colors[gi % len(group_colors)]
             gx1, gy1 = self._img_to_canvas(g.x1, g.y1)
             gx2, gy2 = self._img_to_canvas(g.x2, g.y2)
-            self.canvas.create_rectangle(gx1, gy1, gx2, gy2,
-                                         outline=color, width=2,
-                                         dash=(6, 3), tags="overlay")
-            self.canvas.create_text(gx1 + 4, gy1 + 4, text=g.name,
-                                    anchor=tk.NW, fill=color,
-                                    font=("Arial", 10, "bold"), tags="overlay")
-
-        # 取色标记
-        if self.mode == "pick_color" and self._pick_color_points:
-            for idx, (px, py, pr, pg, pb) in enumerate(self._pick_color_points, 1):
-                cx, cy = self._img_to_canvas(px, py)
-                dot_r = 5
-                hex_c = "#%02x%02x%02x" % (pr, pg, pb)
-                self.canvas.create_oval(cx - dot_r, cy - dot_r, cx + dot_r, cy + dot_r,
-                                        fill=hex_c, outline="white", width=2, tags="overlay")
-                self.canvas.create_text(cx, cy - 12, text=str(idx),
-                                        fill="#00FF00", font=("Arial", 9, "bold"),
-                                        tags="overlay")
+            visible = (max(gx1, gx2) >= x_lo and min(gx1, gx2) <= x_hi
+                       and max(gy1, gy2) >= y_lo and min(gy1, gy2) <= y_hi)
+            self._set_items_visible((rect, text), visible)
+            if not visible:
+                continue
+            canvas.coords(rect, gx1, gy1, gx2, gy2)
+            canvas.itemconfig(rect, outline=color)
+            canvas.coords(text, gx1 + 4, gy1 + 4)
+            canvas.itemconfig(text, text=g.name, fill=color)
+
+        self._draw_pick_markers()
+
+    def _draw_pick_markers(self):
+        """只更新取色标记 item；取色点击/撤销时直接调用，不必重绘整个画布。"""
+        canvas = self.canvas
+        points = self._pick_color_points if self.mode == "pick_color" else []
+        self._sync_items(self._pick_items, len(points), self._create_pick_items)
+        dot_r = 5
+        for idx, ((dot, text), (px, py, pr, pg, pb)) in enumerate(zip(self._pick_items, points), 1):
+            cx, cy = self._img_to_canvas(px, py)
+            canvas.coords(dot, cx - dot_r, cy - dot_r, cx + dot_r, cy + dot_r)
+            canvas.itemconfig(dot, fill="#%02x%02x%02x" % (pr, pg, pb))
+            canvas.coords(text, cx, cy - 12)
+            canvas.itemconfig(text, text=str(idx))
 
     # --------------------------------------------------------- 鼠标事件
     def _on_left_click(self, event):
         if self.pil_image is None:
             return
-        ix, iy = self._canvas_to_img(event.x, event.y)
-        ix = max(0, min(ix, self.img_w - 1))
-        iy = max(0, min(iy, self.img_h - 1))
+        ix, iy = self._canvas_to_img(event.x, event.y, clamp=True)
 
         if self.mode == "set_scale":
             self._handle_scale_click(ix, iy)
@@ -2457,18 +3180,13 @@ class NanoMeasurer(tk.Tk):
 
     def _on_left_drag(self, event):
         if self.mode == "group_select" and self._group_drag_start is not None:
-            self.canvas.delete("group_rect")
             cx1, cy1 = self._img_to_canvas(*self._group_drag_start)
-            cx2, cy2 = event.x, event.y
-            self.canvas.create_rectangle(cx1, cy1, cx2, cy2,
-                                         outline="#00FF00", width=2,
-                                         dash=(6, 4), tags="group_rect")
+            _drag_rect(self.canvas, "group_rect", cx1, cy1, event.x, event.y,
+                       outline="#00FF00", width=2, dash=(6, 4))
 
     def _on_left_release(self, event):
         if self.mode == "group_select" and self._group_drag_start is not None:
-            ix, iy = self._canvas_to_img(event.x, event.y)
-            ix = max(0, min(ix, self.img_w - 1))
-            iy = max(0, min(iy, self.img_h - 1))
+            ix, iy = self._canvas_to_img(event.x, event.y, clamp=True)
             sx, sy = self._group_drag_start
             self._group_drag_start = None
             self.canvas.delete("group_rect")
@@ -2477,9 +3195,7 @@ class NanoMeasurer(tk.Tk):
                 return  # too small
 
             # Count measurements in this rectangle
-            temp_group = MeasurementGroup("", sx, sy, ix, iy)
-            count = sum(1 for m in self.measurements
-                        if temp_group.contains_measurement(m))
+            count = count_in_rect(self._meas_xy, sx, sy, ix, iy)
             if count == 0:
                 messagebox.showinfo(self._t("warn"), self._t("group_empty"))
                 return
@@ -2499,22 +3215,27 @@ class NanoMeasurer(tk.Tk):
             self.status_var.set(self._t("group_created", name=name, n=count))
 
     def _on_motion(self, event):
+        """<Motion> 只记录最新的鼠标位置，最多每 16 ms (约 60 Hz) 处理一次，中间的事件直接合并。"""
+        self._motion_xy = (event.x, event.y)
+        if self._motion_after is None:
+            self._motion_after = self.after(16, self._process_motion)
+
+    def _process_motion(self):
+        self._motion_after = None
         if self.pil_image is None:
             return
-        ix, iy = self._canvas_to_img(event.x, event.y)
+        ex, ey = self._motion_xy
+        ix, iy = self._canvas_to_img(ex, ey)
 
-        mode_text = self._mode_text()
-        self.status_var.set(self._t("status_fmt", mode=mode_text,
-                                    zoom=self.zoom * 100, x=ix, y=iy))
+        # 状态栏模板直接取自当前语言表，逐次移动不再经过 _t 的关键字参数打包
+        self.status_var.set(self._strings["status_fmt"].format(
+            mode=self._mode_text(), zoom=self.zoom * 100, x=ix, y=iy))
 
         if self.click_pt is not None and self.mode in ("set_scale", "measure"):
-            self.canvas.delete("rubber")
             cx1, cy1 = self._img_to_canvas(*self.click_pt)
-            cx2, cy2 = event.x, event.y
+            cx2, cy2 = ex, ey
 
             color = "#00FF00" if self.mode == "set_scale" else "#FF3333"
-            self.canvas.create_line(cx1, cy1, cx2, cy2, fill=color, width=2,
-                                    dash=(6, 4), tags="rubber")
 
             p1x, p1y = self.click_pt
             dist_px = math.hypot(ix - p1x, iy - p1y)
@@ -2523,9 +3244,28 @@ class NanoMeasurer(tk.Tk):
                 dist_text = f"{dv:.2f} {self.display_unit}"
             else:
                 dist_text = f"{dist_px:.1f} px"
-            mid_x, mid_y = (cx1 + cx2) / 2, (cy1 + cy2) / 2
-            self.canvas.create_text(mid_x, mid_y - 12, text=dist_text,
-                                    fill="#00FF00", font=("Arial", 10, "bold"), tags="rubber")
+            self._show_rubber(cx1, cy1, cx2, cy2, color, dist_text)
+
+    def _show_rubber(self, cx1, cy1, cx2, cy2, color, text):
+        """显示橡皮筋线和中点处的距离文字；item 只在第一次 (或清空画布后) 创建。"""
+        canvas = self.canvas
+        if self._rubber_line is None:
+            self._rubber_line = canvas.create_line(0, 0, 0, 0, width=2, dash=(6, 4), tags="rubber")
+            self._rubber_text = canvas.create_text(0, 0, fill="#00FF00",
+                                                   font=("Arial", 10, "bold"), tags="rubber")
+        elif not self._rubber_shown:
+            canvas.itemconfigure("rubber", state="normal")
+            canvas.tag_raise("rubber")  # 隐藏期间新建的标注 item 可能压在上面
+        self._rubber_shown = True
+        canvas.coords(self._rubber_line, cx1, cy1, cx2, cy2)
+        canvas.itemconfigure(self._rubber_line, fill=color)
+        canvas.coords(self._rubber_text, (cx1 + cx2) / 2, (cy1 + cy2) / 2 - 12)
+        canvas.itemconfigure(self._rubber_text, text=text)
+
+    def _hide_rubber(self):
+        if self._rubber_shown:
+            self._rubber_shown = False
+            self.canvas.itemconfigure("rubber", state="hidden")
 
     def _update_status_idle(self):
         mode_text = self._mode_text()
@@ -2547,10 +3287,11 @@ class NanoMeasurer(tk.Tk):
             self.status_var.set(self._t("scale_click2"))
         else:
             x1, y1 = self.click_pt
-            dist_px = math.hypot(ix - x1, iy - y1)
-            if dist_px < 1:
+            dx, dy = ix - x1, iy - y1
+            if dx * dx + dy * dy < 1.0:
                 self.status_var.set(self._t("scale_too_close"))
                 return
+            dist_px = math.hypot(dx, dy)
 
             dlg = ScaleDialog(
                 self,
@@ -2567,6 +3308,8 @@ class NanoMeasurer(tk.Tk):
 
             self.unit = dlg.result_unit
             self.display_unit = dlg.result_unit
+            self._update_disp_factor()
+            self._ensure_right_panel()
             self.display_unit_var.set(dlg.result_unit)
             self.scale = dlg.result / dist_px
             self.scale_label.config(text=self._t("scale_fmt", v=self.scale, u=self.unit))
@@ -2574,27 +3317,34 @@ class NanoMeasurer(tk.Tk):
 
             for m in self.measurements:
                 m.nm_dist = m.pixel_dist * self.scale
+            np.multiply(self._pixel_dist, self.scale, out=self._nm_dist)
             self._refresh_list()
 
             self.click_pt = None
             self.mode = "idle"
             self.canvas.config(cursor="")
-            self.canvas.delete("rubber")
+            self._hide_rubber()
             self._render()
             self.status_var.set(self._t("scale_set_fmt", v=self.scale, u=self.unit))
 
     def _update_column_header(self):
         """更新列表标题以显示当前单位"""
+        self._ensure_right_panel()
         self.tree.heading("col_diameter",
                           text=self._t("col_diameter", u=self.display_unit))
 
+    def _update_disp_factor(self):
+        """校准单位或显示单位变化后重新求换算系数 (长度换算是线性的，逐值只需一次乘法)。"""
+        self._disp_factor = convert_length(1.0, self.unit, self.display_unit)
+
     def _display_value(self, calib_value):
         """将校准单位的值转换为当前显示单位。"""
-        return convert_length(calib_value, self.unit, self.display_unit)
+        return calib_value * self._disp_factor
 
     def _on_display_unit_change(self, event=None):
         """用户切换显示单位时的回调。"""
         self.display_unit = self.display_unit_var.get()
+        self._update_disp_factor()
         self._update_column_header()
         self._refresh_list()
         self._render()
@@ -2630,19 +3380,20 @@ class NanoMeasurer(tk.Tk):
             self.status_var.set(self._t("meas_click2"))
         else:
             x1, y1 = self.click_pt
-            dist_px = math.hypot(ix - x1, iy - y1)
-            if dist_px < 1:
+            # 只需判断两点是否过近，比较距离平方即可；长度由 Measurement 自己计算
+            dx, dy = ix - x1, iy - y1
+            if dx * dx + dy * dy < 1.0:
                 self.status_var.set(self._t("scale_too_close"))
                 return
 
             m = Measurement(x1, y1, ix, iy, self.scale)
-            self.measurements.append(m)
+            self._append_measurement(m)
             self.undo_stack.clear()
-            self._refresh_list()
+            self._append_row()
             self._render()
 
             self.click_pt = None
-            self.canvas.delete("rubber")
+            self._hide_rubber()
             n_meas = len(self.measurements)
             self.status_var.set(self._t("meas_recorded",
                                         n=n_meas, d=self._display_value(m.nm_dist),
@@ -2678,9 +3429,11 @@ class NanoMeasurer(tk.Tk):
         px_y = int(round(iy))
         px_x = max(0, min(px_x, self.img_w - 1))
         px_y = max(0, min(px_y, self.img_h - 1))
-        r, g, b = self.pil_image.getpixel((px_x, px_y))[:3]
+        # 取点击处 3x3 邻域 (边缘处截断) 的平均颜色，单个噪点像素不会带偏取色结果
+        patch = self._img_np[max(0, px_y - 1):px_y + 2, max(0, px_x - 1):px_x + 2]
+        r, g, b = np.rint(patch.reshape(-1, 3).mean(axis=0)).astype(int).tolist()
         self._pick_color_points.append((px_x, px_y, r, g, b))
-        self._render()  # 重绘以显示取色标记
+        self._draw_pick_markers()
 
         if len(self._pick_color_points) < self._pick_color_total:
             i = len(self._pick_color_points) + 1
@@ -2693,40 +3446,106 @@ class NanoMeasurer(tk.Tk):
         self._pick_color_points = []
         self.mode = "idle"
         self.canvas.config(cursor="")
-        self._render()
+        self._draw_pick_markers()
         ColorAnalysisWindow(self, self, rgb_list)
 
     # --------------------------------------------------------- 测量管理
+    def _set_meas_count(self, n):
+        """将 _meas_xy / _pixel_dist / _nm_dist 指向 SoA 缓冲的前 n 行。"""
+        buf = self._meas_buf
+        self._meas_xy = buf[:n, :4]      # 各测量的端点 X1, Y1, X2, Y2
+        self._pixel_dist = buf[:n, 4]
+        self._nm_dist = buf[:n, 5]
+
+    def _append_measurement(self, m):
+        """追加一条测量，同时写入 SoA 缓冲的下一行 (均摊 O(1))。"""
+        n = len(self.measurements)
+        if n == len(self._meas_buf):
+            grown = np.empty((2 * n, 6), dtype=np.float64)
+            grown[:n] = self._meas_buf
+            self._meas_buf = grown
+        self._meas_buf[n] = (m.x1, m.y1, m.x2, m.y2, m.pixel_dist, m.nm_dist)
+        self.measurements.append(m)
+        self._set_meas_count(n + 1)
+
+    def _remove_measurements(self, indices):
+        """删除给定下标的测量，返回被删除的对象列表 (按下标升序)；SoA 缓冲整体压缩一次。"""
+        n = len(self.measurements)
+        keep = np.ones(n, dtype=bool)
+        keep[[i for i in indices if 0 <= i < n]] = False
+        kept, removed = [], []
+        for m, k in zip(self.measurements, keep.tolist()):
+            (kept if k else removed).append(m)
+        self.measurements[:] = kept
+        k = len(kept)
+        self._meas_buf[:k] = self._meas_buf[:n][keep]
+        self._set_meas_count(k)
+        return removed
+
+    def _clear_measurements(self):
+        self.measurements.clear()
+        self._set_meas_count(0)
+
+    def _display_vals(self):
+        """返回 (当前显示单位下的直径数组, 单位)；未设比例尺时为像素距离。"""
+        if self.scale > 0:
+            return self._nm_dist * self._disp_factor, self.display_unit
+        return self._pixel_dist, "px"
+
+    def _format_rows(self, start=0):
+        """整体格式化第 start 条起各测量的 (列表数值, 画布标注文字) 两个列表。"""
+        if self.scale > 0:
+            dvs = (self._nm_dist[start:] * self._disp_factor).tolist()
+            vals = [f"{dv:.2f}" for dv in dvs]
+            return vals, [f"{v} {self.display_unit}" for v in vals]
+        vals = [f"{p:.1f} px" for p in self._pixel_dist[start:].tolist()]
+        return vals, vals
+
     def _refresh_list(self):
+        """整表重建：单位、比例尺或语言变化以及清空/打开图片时调用。"""
+        self._ensure_right_panel()
+        # 列表数值与画布标注文字在这里整体格式化一次，_draw_overlays 每次重绘直接取用
+        vals, self._labels = self._format_rows()
         self.tree.delete(*self.tree.get_children())
-        for i, m in enumerate(self.measurements, 1):
-            if self.scale > 0:
-                dv = self._display_value(m.nm_dist)
-                val = f"{dv:.2f}"
-            else:
-                val = f"{m.pixel_dist:.1f} px"
-            self.tree.insert("", tk.END, iid=str(i), values=(i, val))
+        for i, val in enumerate(vals, 1):
+            self.tree.insert("", tk.END, values=(i, val))
+        self._update_stats()
 
+    def _append_row(self):
+        """新增一条测量后只在列表末尾插入一行。"""
+        n = len(self.measurements)
+        vals, labels = self._format_rows(n - 1)
+        self._labels += labels
+        self.tree.insert("", tk.END, values=(n, vals[0]))
+        self._update_stats()
+
+    def _remove_rows(self, positions):
+        """测量删除后只删掉列表中对应的行，并给其后的行重新编号。"""
+        children = self.tree.get_children()
+        self.tree.delete(*(children[p] for p in positions))
+        start = min(positions)
+        vals, labels = self._format_rows(start)
+        del self._labels[start:]
+        self._labels += labels
+        for i, (iid, val) in enumerate(zip(self.tree.get_children()[start:], vals), start + 1):
+            self.tree.item(iid, values=(i, val))
+        self._update_stats()
+
+    def _update_stats(self):
         n = len(self.measurements)
         if n == 0:
             self.stat_label.config(text=f'{self._t("count")}: 0')
             return
 
-        if self.scale > 0:
-            vals = [self._display_value(m.nm_dist) for m in self.measurements]
-            unit = self.display_unit
-        else:
-            vals = [m.pixel_dist for m in self.measurements]
-            unit = "px"
-        mean = np.mean(vals)
-        std = np.std(vals, ddof=1) if n > 1 else 0.0
+        vals, unit = self._display_vals()
+        _, mean, std, v_min, v_max = _describe(vals)
         self.stat_label.config(
             text=(
                 f"{self._t('count')}: {n}\n"
                 f"{self._t('mean')}: {mean:.2f} {unit}\n"
                 f"{self._t('std')}: {std:.2f} {unit}\n"
-                f"{self._t('min')}: {min(vals):.2f} {unit}\n"
-                f"{self._t('max')}: {max(vals):.2f} {unit}"
+                f"{self._t('min')}: {v_min:.2f} {unit}\n"
+                f"{self._t('max')}: {v_max:.2f} {unit}"
             )
         )
 
@@ -2734,18 +3553,18 @@ class NanoMeasurer(tk.Tk):
         sel = self.tree.selection()
         if not sel:
             return
-        indices = sorted([int(s) - 1 for s in sel], reverse=True)
-        for idx in indices:
-            if 0 <= idx < len(self.measurements):
-                self.measurements.pop(idx)
-        self._refresh_list()
+        # 一次取出全部行建立 iid → 位置映射，不对每个选中行单独调用 tree.index (各为 O(N))
+        row_pos = {iid: i for i, iid in enumerate(self.tree.get_children())}
+        positions = sorted(row_pos[s] for s in sel)
+        self._remove_measurements(positions)
+        self._remove_rows(positions)
         self._render()
 
     def clear_all(self):
         if not self.measurements:
             return
         if messagebox.askyesno(self._t("confirm"), self._t("clear_confirm")):
-            self.measurements.clear()
+            self._clear_measurements()
             self.undo_stack.clear()
             self._refresh_list()
             self._render()
@@ -2753,21 +3572,22 @@ class NanoMeasurer(tk.Tk):
     def undo(self):
         if self.mode == "pick_color" and self._pick_color_points:
             self._pick_color_points.pop()
-            self._render()
+            self._draw_pick_markers()
             i = len(self._pick_color_points) + 1
             self.status_var.set(self._t("pick_color_progress",
                                         i=i, n=self._pick_color_total))
             return
         if self.click_pt is not None:
             self.click_pt = None
-            self.canvas.delete("rubber")
+            self._hide_rubber()
             self.status_var.set(self._t("undo_click"))
             return
         if not self.measurements:
             return
-        m = self.measurements.pop()
+        last = len(self.measurements) - 1
+        m = self._remove_measurements([last])[0]
         self.undo_stack.append(m)
-        self._refresh_list()
+        self._remove_rows([last])
         self._render()
         self.status_var.set(self._t("undo_meas_fmt", n=len(self.measurements) + 1))
 
@@ -2777,7 +3597,7 @@ class NanoMeasurer(tk.Tk):
         self._pick_color_points = []
         self._group_drag_start = None
         self.canvas.config(cursor="")
-        self.canvas.delete("rubber")
+        self._hide_rubber()
         self.canvas.delete("group_rect")
         self._render()
         self.status_var.set(self._t("cancelled"))
@@ -2787,18 +3607,12 @@ class NanoMeasurer(tk.Tk):
         if not self.measurements:
             messagebox.showwarning(self._t("warn"), self._t("no_data"))
             return
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from matplotlib.figure import Figure
 
-        if self.scale > 0:
-            vals = np.array([self._display_value(m.nm_dist)
-                             for m in self.measurements])
-            unit = self.display_unit
-        else:
-            vals = np.array([m.pixel_dist for m in self.measurements])
-            unit = "px"
+        vals, unit = self._display_vals()
 
-        n = len(vals)
-        mean = np.mean(vals)
-        std = np.std(vals, ddof=1) if n > 1 else 0.0
+        n, mean, std, v_min, v_max = _describe(vals)
 
         win = tk.Toplevel(self)
         win.title(self._t("hist_title"))
@@ -2807,14 +3621,15 @@ class NanoMeasurer(tk.Tk):
         fig = Figure(figsize=(7, 5), dpi=100)
         ax = fig.add_subplot(111)
 
-        num_bins = max(5, int(math.sqrt(n)))
-        counts, bins, patches = ax.hist(vals, bins=num_bins, density=True,
-                                         alpha=0.7, color="#4C72B0", edgecolor="white",
-                                         label=self._t("hist_legend_hist"))
+        num_bins = _hist_bins(n)
+        # 传入已求出的数据范围，np.histogram 按等宽箱直接算箱号，不再重复求 min/max
+        ax.hist(vals, bins=num_bins, range=(v_min, v_max), density=True,
+                alpha=0.7, color="#4C72B0", edgecolor="white",
+                label=self._t("hist_legend_hist"))
 
         if std > 0:
-            x_fit = np.linspace(vals.min() - std, vals.max() + std, 200)
-            y_fit = norm.pdf(x_fit, mean, std)
+            x_fit = np.linspace(v_min - std, v_max + std, _FIT_N)
+            y_fit = _gaussian_pdf(x_fit, mean, std)
             ax.plot(x_fit, y_fit, "r-", linewidth=2,
                     label=self._t("hist_legend_fit"))
 
@@ -2847,16 +3662,20 @@ class NanoMeasurer(tk.Tk):
         if not path:
             return
 
-        group_labels = assign_groups(self.measurements, self.groups)
+        # 端点与距离直接取自 SoA 缓冲，分组判定和 CSV 写出都不再逐个读取 Measurement 属性
+        arrays = (self._meas_xy, self._pixel_dist, self._nm_dist)
+        group_labels = assign_groups(self.measurements, self.groups, coords=self._meas_xy)
 
         try:
-            with open(path, "w", newline="", encoding="utf-8-sig") as f:
+            with open(path, "w", newline="", encoding="utf-8-sig",
+                      buffering=1 << 20) as f:
                 writer = csv.writer(f)
                 write_csv_with_groups(writer, self.measurements, self.groups,
                                       group_labels, scale=self.scale,
                                       lang=self.lang,
                                       calib_unit=self.unit,
-                                      display_unit=self.display_unit)
+                                      display_unit=self.display_unit,
+                                      arrays=arrays)
 
             self.status_var.set(self._t("exported_fmt", p=path))
         except Exception as exc:
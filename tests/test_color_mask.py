@@ -0,0 +1,238 @@
+"""
+Tests for the HSV tolerance masks used by the color analysis window.
+
+The full-image HSV is stored as uint8 (H 0-179, S/V 0-255) and matched
+against the picked color center with integer lower/upper bounds; the hue
+channel wraps around at 180.
+"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from nano_measurer import (
+    _band_lut, _band_mask, _hue_band_lut, _hue_band_mask, _hsv_match_mask, _pool_any,
+    _rgb_to_hsv_array, _rgb_to_hsv_point, _rgb_to_hsv_u8, _segment_spans,
+)
+
+
+# ---------------------------------------------------------------------------
+# Test uint8 HSV conversion
+# ---------------------------------------------------------------------------
+
+class TestHsvU8:
+    """Test the quantized uint8 HSV image."""
+
+    def test_dtype_and_shape(self):
+        rgb = np.zeros((4, 5, 3), dtype=np.uint8)
+        hsv = _rgb_to_hsv_u8(rgb)
+        assert hsv.dtype == np.uint8
+        assert hsv.shape == (4, 5, 3)
+
+    def test_primary_colors(self):
+        rgb = np.array([[[255, 0, 0], [0, 255, 0], [0, 0, 255]]], dtype=np.uint8)
+        hsv = _rgb_to_hsv_u8(rgb)[0]
+        assert hsv[:, 0].tolist() == [0, 60, 120]
+        assert hsv[:, 1].tolist() == [255, 255, 255]
+        assert hsv[:, 2].tolist() == [255, 255, 255]
+
+    def test_close_to_float_version(self):
+        rng = np.random.default_rng(0)
+        rgb = rng.integers(0, 256, (32, 32, 3), dtype=np.uint8)
+        ref = _rgb_to_hsv_array(rgb)
+        hsv = _rgb_to_hsv_u8(rgb).astype(np.float32)
+        h_diff = np.abs(hsv[..., 0] - ref[..., 0])
+        h_diff = np.minimum(h_diff, 180.0 - h_diff)
+        assert h_diff.max() <= 1.0
+        assert np.abs(hsv[..., 1:] - ref[..., 1:]).max() <= 1.0
+
+    def test_point_matches_array(self):
+        rng = np.random.default_rng(5)
+        pts = rng.integers(0, 256, (200, 3))
+        ref = _rgb_to_hsv_array(pts.astype(np.uint8)[None])[0]
+        got = np.array([_rgb_to_hsv_point(*map(int, p)) for p in pts])
+        h_diff = np.abs(got[:, 0] - ref[:, 0])
+        assert np.minimum(h_diff, 180.0 - h_diff).max() < 1e-3
+        assert np.abs(got[:, 1:] - ref[:, 1:]).max() < 1e-3
+
+
+# ---------------------------------------------------------------------------
+# Test integer tolerance masks
+# ---------------------------------------------------------------------------
+
+class TestBandMasks:
+    """Test S/V band mask and the ring-shaped hue band mask."""
+
+    def test_band_matches_abs_diff(self):
+        x = np.arange(256, dtype=np.uint8)
+        for center, tol in [(100.4, 20), (0.0, 10), (250.7, 30), (128.0, 0)]:
+            expected = np.abs(x.astype(float) - center) <= tol
+            assert np.array_equal(_band_mask(x, center, tol), expected)
+
+    def test_band_empty(self):
+        x = np.arange(256, dtype=np.uint8)
+        assert not _band_mask(x, 100.5, 0).any()
+
+    def test_hue_matches_ring_distance(self):
+        h = np.arange(180, dtype=np.uint8)
+        for center, tol in [(90.0, 15), (3.2, 10), (176.8, 10), (0.0, 0), (45.5, 90)]:
+            diff = np.abs(h.astype(float) - center)
+            expected = np.minimum(diff, 180.0 - diff) <= tol
+            assert np.array_equal(_hue_band_mask(h, center, tol), expected)
+
+    def test_hue_wraps_around_zero(self):
+        h = np.array([0, 5, 90, 175, 179], dtype=np.uint8)
+        mask = _hue_band_mask(h, 178.0, 8)
+        assert mask.tolist() == [True, True, False, True, True]
+
+    @pytest.mark.parametrize("tol", [90, 120])
+    def test_hue_full_circle(self, tol):
+        h = np.arange(180, dtype=np.uint8)
+        assert _hue_band_mask(h, 37.0, tol).all()
+
+    def test_lut_size_and_out_of_range_hue(self):
+        assert _band_lut(128.0, 20).shape == (256,)
+        lut = _hue_band_lut(10.0, 120)
+        assert lut[:180].all()
+        assert not lut[180:].any()
+
+
+# ---------------------------------------------------------------------------
+# Test combined HSV match mask
+# ---------------------------------------------------------------------------
+
+class TestHsvMatchMask:
+    """Test the combined H/S/V tolerance mask."""
+
+    def _reference(self, hsv, center, tol):
+        hsv = hsv.astype(float)
+        h_diff = np.abs(hsv[..., 0] - center[0])
+        h_diff = np.minimum(h_diff, 180.0 - h_diff)
+        return ((h_diff <= tol[0])
+                & (np.abs(hsv[..., 1] - center[1]) <= tol[1])
+                & (np.abs(hsv[..., 2] - center[2]) <= tol[2]))
+
+    @pytest.mark.parametrize("center, tol", [
+        ((30.0, 120.0, 200.0), (15, 50, 50)),
+        ((170.5, 10.0, 250.0), (20, 128, 10)),
+        ((90.0, 128.0, 128.0), (90, 128, 128)),
+        ((5.0, 240.0, 3.0), (100, 30, 128)),
+    ])
+    def test_matches_reference(self, center, tol):
+        rng = np.random.default_rng(1)
+        hsv = np.empty((40, 50, 3), dtype=np.uint8)
+        hsv[..., 0] = rng.integers(0, 180, (40, 50))
+        hsv[..., 1:] = rng.integers(0, 256, (40, 50, 2))
+        mask = _hsv_match_mask(hsv, center, tol)
+        assert np.array_equal(mask, self._reference(hsv, center, tol))
+
+    def test_full_tolerance_matches_everything(self):
+        hsv = np.zeros((3, 4, 3), dtype=np.uint8)
+        hsv[..., 1:] = 255
+        assert _hsv_match_mask(hsv, (0.0, 128.0, 128.0), (90, 128, 128)).all()
+
+    def test_row_tiling_matches_single_block(self, monkeypatch):
+        import nano_measurer
+        rng = np.random.default_rng(2)
+        hsv = np.empty((37, 20, 3), dtype=np.uint8)
+        hsv[..., 0] = rng.integers(0, 180, (37, 20))
+        hsv[..., 1:] = rng.integers(0, 256, (37, 20, 2))
+        center, tol = (175.0, 100.0, 100.0), (10, 60, 60)
+        monkeypatch.setattr(nano_measurer, "_MASK_TILE_BYTES", 20 * 3 * 4)  # 4 rows per tile
+        mask = _hsv_match_mask(hsv, center, tol)
+        assert np.array_equal(mask, self._reference(hsv, center, tol))
+
+    def test_parallel_tiles_match_reference(self, monkeypatch):
+        import nano_measurer
+        rng = np.random.default_rng(6)
+        hsv = np.empty((41, 24, 3), dtype=np.uint8)
+        hsv[..., 0] = rng.integers(0, 180, (41, 24))
+        hsv[..., 1:] = rng.integers(0, 256, (41, 24, 2))
+        center, tol = (60.0, 90.0, 160.0), (25, 80, 70)
+        monkeypatch.setattr(nano_measurer, "_MASK_TILE_BYTES", 24 * 3 * 5)  # 5 rows per tile
+        monkeypatch.setattr(nano_measurer, "_MASK_WORKERS", 3)
+        mask = _hsv_match_mask(hsv, center, tol)
+        assert np.array_equal(mask, self._reference(hsv, center, tol))
+
+    @pytest.mark.parametrize("tol", [(15, 60, 60), (90, 128, 128)])
+    def test_exclude_and_out_buffer(self, monkeypatch, tol):
+        import nano_measurer
+        rng = np.random.default_rng(4)
+        hsv = np.empty((23, 16, 3), dtype=np.uint8)
+        hsv[..., 0] = rng.integers(0, 180, (23, 16))
+        hsv[..., 1:] = rng.integers(0, 256, (23, 16, 2))
+        cut = rng.random((23, 16)) > 0.8
+        deleted = np.zeros((23, 16), dtype=bool)
+        deleted[:5] = True
+        center = (40.0, 128.0, 128.0)
+        monkeypatch.setattr(nano_measurer, "_MASK_TILE_BYTES", 16 * 3 * 3)
+        buf = np.empty((23, 16), dtype=bool)
+        mask = _hsv_match_mask(hsv, center, tol, exclude=[cut, deleted], out=buf)
+        assert mask is buf
+        expected = self._reference(hsv, center, tol) & ~cut & ~deleted
+        assert np.array_equal(mask, expected)
+
+
+# ---------------------------------------------------------------------------
+# Test mask downsampling for the thumbnail preview
+# ---------------------------------------------------------------------------
+
+class TestPoolAny:
+    """Test any-pooling of full-resolution masks down to the thumbnail."""
+
+    def test_shape(self):
+        mask = np.zeros((37, 53), dtype=bool)
+        assert _pool_any(mask, 10, 14).shape == (10, 14)
+
+    def test_thin_line_survives(self):
+        mask = np.zeros((100, 100), dtype=bool)
+        mask[:, 47] = True
+        pooled = _pool_any(mask, 25, 25)
+        assert pooled[:, 11].all()
+        assert pooled.sum() == 25
+
+    def test_identity_size(self):
+        rng = np.random.default_rng(3)
+        mask = rng.random((12, 9)) > 0.5
+        assert np.array_equal(_pool_any(mask, 12, 9), mask)
+
+
+# ---------------------------------------------------------------------------
+# Test brush stroke rasterization
+# ---------------------------------------------------------------------------
+
+class TestSegmentSpans:
+    """Test the per-row spans covered by a round-capped brush segment."""
+
+    def _brute(self, x0, y0, x1, y1, r, h, w):
+        yy, xx = np.mgrid[0:h, 0:w].astype(float)
+        dx, dy = x1 - x0, y1 - y0
+        seg = dx * dx + dy * dy
+        t = np.clip(((xx - x0) * dx + (yy - y0) * dy) / seg, 0, 1) if seg else 0.0
+        return (xx - x0 - t * dx) ** 2 + (yy - y0 - t * dy) ** 2 <= r * r + 1e-9
+
+    def _rasterize(self, *args):
+        h, w = args[-2:]
+        mask = np.zeros((h, w), dtype=bool)
+        for y, a, b in zip(*_segment_spans(*args)):
+            mask[y, a:b + 1] = True
+        return mask
+
+    @pytest.mark.parametrize("seg", [
+        (3.3, 4.1, 40.7, 25.2, 2.5),
+        (10.0, 5.0, 10.0, 30.0, 1.5),    # vertical
+        (2.0, 12.0, 45.0, 12.0, 3.0),    # horizontal
+        (20.0, 15.0, 20.0, 15.0, 4.0),   # single point
+        (-10.0, -5.0, 60.0, 40.0, 6.0),  # clipped at the borders
+    ])
+    def test_matches_distance_test(self, seg):
+        h, w = 32, 48
+        assert np.array_equal(self._rasterize(*seg, h, w), self._brute(*seg, h, w))
+
+    def test_outside_image_is_empty(self):
+        ys, _, _ = _segment_spans(-50.0, -50.0, -20.0, -30.0, 3.0, 20, 20)
+        assert len(ys) == 0
@@ -163,6 +163,42 @@ class TestGroupAssignment:
         result = assign_groups(measurements, groups)
         assert result == ["A", "B", "C", ""]
 
+    def test_coords_array_matches_objects(self):
+        from nano_measurer import MeasurementGroup, _measurement_arrays, assign_groups
+        rng = np.random.default_rng(1)
+        measurements = [_make_measurement(*p) for p in rng.uniform(0, 200, (200, 4)).round()]
+        groups = [
+            MeasurementGroup("A", 0, 0, 100, 100),
+            MeasurementGroup("B", 50, 50, 180, 160),
+        ]
+        coords = _measurement_arrays(measurements)[0]
+        assert (assign_groups(measurements, groups, coords=coords)
+                == assign_groups(measurements, groups))
+
+
+class TestCountInRect:
+    """Test counting measurements whose midpoints fall in a drag rectangle."""
+
+    def test_matches_contains_measurement(self):
+        from nano_measurer import MeasurementGroup, _measurement_arrays, count_in_rect
+        rng = np.random.default_rng(0)
+        pts = rng.uniform(0, 100, (300, 4)).round()
+        measurements = [_make_measurement(*p) for p in pts]
+        coords = _measurement_arrays(measurements)[0]
+        for x1, y1, x2, y2 in [(10, 10, 60, 60), (80, 20, 30, 90), (50, 50, 50, 50)]:
+            g = MeasurementGroup("", x1, y1, x2, y2)
+            expected = sum(1 for m in measurements if g.contains_measurement(m))
+            assert count_in_rect(coords, x1, y1, x2, y2) == expected
+
+    def test_boundary_is_inclusive(self):
+        from nano_measurer import _measurement_arrays, count_in_rect
+        coords = _measurement_arrays([_make_measurement(0, 0, 100, 100)])[0]
+        assert count_in_rect(coords, 50, 50, 100, 100) == 1
+
+    def test_empty(self):
+        from nano_measurer import count_in_rect
+        assert count_in_rect(np.empty((0, 4)), 0, 0, 10, 10) == 0
+
 
 # ---------------------------------------------------------------------------
 # Test CSV export with group information
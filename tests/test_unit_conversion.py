@@ -19,7 +19,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from nano_measurer import (
     Measurement, STRINGS, UNIT_TO_NM, SUPPORTED_UNITS,
-    convert_length, write_csv_with_groups, assign_groups,
+    convert_length, write_csv_with_groups, assign_groups, _describe, _hist_bins,
 )
 
 
@@ -121,6 +121,54 @@ class TestMeasurementDisplayValues:
         assert display == pytest.approx(0.2)
 
 
+class TestMeasurementFromArrays:
+    """Test bulk construction of measurements from coordinate arrays."""
+
+    def test_matches_single_construction(self):
+        x1, y1 = [0.0, 10.0, 3.5], [0.0, 5.0, 7.25]
+        x2, y2 = [3.0, 10.0, 9.0], [4.0, 25.0, 1.0]
+        bulk = Measurement.from_arrays(x1, y1, x2, y2, 0.5)
+        single = [Measurement(a, b, c, d, 0.5) for a, b, c, d in zip(x1, y1, x2, y2)]
+        assert len(bulk) == 3
+        for mb, ms in zip(bulk, single):
+            assert (mb.x1, mb.y1, mb.x2, mb.y2) == (ms.x1, ms.y1, ms.x2, ms.y2)
+            assert mb.pixel_dist == pytest.approx(ms.pixel_dist)
+            assert mb.nm_dist == pytest.approx(ms.nm_dist)
+
+    def test_no_scale_gives_zero_nm(self):
+        bulk = Measurement.from_arrays(np.zeros(2), np.zeros(2),
+                                       np.array([3.0, 6.0]), np.array([4.0, 8.0]), 0.0)
+        assert [m.pixel_dist for m in bulk] == pytest.approx([5.0, 10.0])
+        assert [m.nm_dist for m in bulk] == [0.0, 0.0]
+        assert all(isinstance(m.x2, float) for m in bulk)
+
+    def test_empty(self):
+        assert Measurement.from_arrays([], [], [], [], 1.0) == []
+
+
+class TestDescribe:
+    """Test the shared summary statistics helper."""
+
+    def test_matches_numpy(self):
+        vals = np.random.default_rng(0).normal(250.0, 40.0, 1000)
+        n, mean, std, lo, hi = _describe(vals)
+        assert n == 1000
+        assert mean == pytest.approx(vals.mean())
+        assert std == pytest.approx(vals.std(ddof=1))
+        assert (lo, hi) == (vals.min(), vals.max())
+
+    def test_single_value_has_zero_std(self):
+        assert _describe(np.array([7.5])) == (1, 7.5, 0.0, 7.5, 7.5)
+
+
+class TestHistBins:
+    """Test the histogram bin count rule."""
+
+    @pytest.mark.parametrize("n, bins", [(1, 5), (30, 5), (100, 10), (2000, 44), (10 ** 6, 64)])
+    def test_sqrt_rule_clamped(self, n, bins):
+        assert _hist_bins(n) == bins
+
+
 # ---------------------------------------------------------------------------
 # Test CSV export uses display unit
 # ---------------------------------------------------------------------------